@@ -76,14 +76,9 @@ export class DashboardComponent implements OnInit {
   loadDashboardData() {
     this.loading = true;
 
-    Promise.all([
-      this.dashboardService.getSummary().toPromise(),
-      this.dashboardService.getRecentTransactions().toPromise(),
-      this.dashboardService.getCategoryExpense().toPromise(),
-      this.dashboardService.getMonthlyTrend().toPromise()
-    ])
-      .then(([summary, recent, catExpense, trend]) => {
-        
+    this.dashboardService.getOverview().toPromise()
+      .then(({ summary, recent, category_expense: catExpense, monthly_trend: trend }) => {
+
         // Summary
         this.totalIncome = summary.total_income;
         this.totalExpense = summary.total_expense;
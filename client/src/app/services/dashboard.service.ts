@@ -11,6 +11,12 @@ export class DashboardService {
 
     constructor(private http: HttpClient, private apiService: ApiService) {}
 
+    // summary, recent, category-expense and monthly-trend in a single request
+    getOverview(months = 6, recentLimit = 5): Observable<any> {
+        const headers = this.apiService.buildHeaders();
+        return this.http.get(`${this.api}/overview?months=${months}&recent_limit=${recentLimit}`, { headers });
+    }
+
     getSummary(): Observable<any> {
         const headers = this.apiService.buildHeaders();
         return this.http.get(`${this.api}/summary`, { headers });
@@ -0,0 +1,57 @@
+-- migrate_categories.sql
+-- One-off conversion of free-text categories to the per-user categories table.
+-- Runs in one transaction; afterwards rebuild the rollups:
+--   python -m app.transactions.rollups
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS categories (
+    id          SERIAL PRIMARY KEY,
+    user_id     UUID NOT NULL REFERENCES "user"(id) ON DELETE CASCADE,
+    name        VARCHAR(100) NOT NULL,
+    created_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_categories_user_name UNIQUE (user_id, name)
+);
+
+INSERT INTO categories (user_id, name)
+SELECT user_id, category FROM transactions
+UNION
+SELECT user_id, category FROM budgets
+ON CONFLICT DO NOTHING;
+
+-- TRANSACTIONS: the generated search_vector depends on category, so it goes first
+ALTER TABLE transactions ADD COLUMN category_id INTEGER;
+
+UPDATE transactions t SET category_id = c.id
+FROM categories c
+WHERE c.user_id = t.user_id AND c.name = t.category;
+
+ALTER TABLE transactions
+    ALTER COLUMN category_id SET NOT NULL,
+    ADD CONSTRAINT transactions_category_id_fkey FOREIGN KEY (category_id) REFERENCES categories(id),
+    DROP COLUMN search_vector,
+    DROP COLUMN category;
+
+ALTER TABLE transactions
+    ADD COLUMN search_vector TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('simple', coalesce(note, ''))) STORED;
+
+CREATE INDEX ix_transactions_search_vector ON transactions USING GIN (search_vector);
+CREATE INDEX ix_transactions_user_category_date ON transactions (user_id, category_id, date);
+
+-- BUDGETS
+ALTER TABLE budgets ADD COLUMN category_id INTEGER;
+
+UPDATE budgets b SET category_id = c.id
+FROM categories c
+WHERE c.user_id = b.user_id AND c.name = b.category;
+
+ALTER TABLE budgets
+    ALTER COLUMN category_id SET NOT NULL,
+    ADD CONSTRAINT budgets_category_id_fkey FOREIGN KEY (category_id) REFERENCES categories(id),
+    DROP COLUMN category;
+
+-- ROLLUPS: keyed by category_id now; recreated and refilled by the rebuild
+DROP TABLE transaction_monthly_rollups;
+
+COMMIT;
@@ -16,14 +16,30 @@ CREATE TABLE IF NOT EXISTS users (
     created_at    TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
+-- ==============
+-- CATEGORIES
+-- ==============
+-- Per-user names; transactions, budgets and rollups store the id
+-- (an existing database is converted by migrate_categories.sql)
+CREATE TABLE IF NOT EXISTS categories (
+    id          SERIAL PRIMARY KEY,
+    user_id     BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    name        VARCHAR(100) NOT NULL,
+    created_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_categories_user_name UNIQUE (user_id, name)
+);
+
 -- ==============
 -- TRANSACTIONS
 -- ==============
+-- The API declares this table PARTITION BY RANGE (date) with PRIMARY KEY (id, date)
+-- and manages yearly partitions itself; convert a table created from this script with
+--   python -m app.transactions.partitions migrate
 CREATE TABLE IF NOT EXISTS transactions (
     id          BIGSERIAL PRIMARY KEY,
     user_id     BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     type        VARCHAR(10) NOT NULL CHECK (type IN ('INCOME', 'EXPENSE')),
-    category    VARCHAR(100) NOT NULL,
+    category_id INTEGER NOT NULL REFERENCES categories(id),
     amount      NUMERIC(12,2) NOT NULL CHECK (amount >= 0),
     date        DATE NOT NULL,
     note        TEXT,
@@ -35,6 +51,56 @@ CREATE TABLE IF NOT EXISTS transactions (
 CREATE INDEX IF NOT EXISTS idx_transactions_user_date
     ON transactions(user_id, date);
 
+-- Backs ORDER BY date DESC, id DESC and keyset (cursor) pagination
+CREATE INDEX IF NOT EXISTS ix_transactions_user_date_id
+    ON transactions(user_id, date, id);
+
+-- Category filters and budget spending per (user, category)
+CREATE INDEX IF NOT EXISTS ix_transactions_user_category_date
+    ON transactions(user_id, category_id, date);
+
+-- Full-text search over the note (prefix queries via to_tsquery('simple', 'foo:*'));
+-- category names are matched against the categories table
+ALTER TABLE transactions
+    ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        to_tsvector('simple', coalesce(note, ''))
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_transactions_search_vector
+    ON transactions USING GIN (search_vector);
+
+-- Delta sync: change_seq is redrawn on every update; deletes leave tombstones
+CREATE SEQUENCE IF NOT EXISTS transaction_change_seq;
+
+ALTER TABLE transactions
+    ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT nextval('transaction_change_seq');
+
+CREATE INDEX IF NOT EXISTS ix_transactions_user_change_seq
+    ON transactions(user_id, change_seq);
+
+CREATE TABLE IF NOT EXISTS transaction_tombstones (
+    seq            BIGINT PRIMARY KEY DEFAULT nextval('transaction_change_seq'),
+    user_id        BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    transaction_id BIGINT NOT NULL,
+    deleted_at     TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_transaction_tombstones_user_seq
+    ON transaction_tombstones(user_id, seq);
+
+-- Multi-currency: amounts stay in the currency they were entered in
+CREATE TABLE IF NOT EXISTS exchange_rates (
+    currency    VARCHAR(3) PRIMARY KEY,
+    rate        NUMERIC(20,10) NOT NULL,   -- units per one base currency (USD)
+    updated_at  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO exchange_rates (currency, rate) VALUES ('USD', 1) ON CONFLICT DO NOTHING;
+
+ALTER TABLE transactions
+    ADD COLUMN IF NOT EXISTS currency VARCHAR(3) NOT NULL DEFAULT 'USD';
+
 -- Auto-update updated_at on change (optional but nice)
 CREATE OR REPLACE FUNCTION set_transactions_updated_at()
 RETURNS TRIGGER AS $$
@@ -57,12 +123,12 @@ EXECUTE FUNCTION set_transactions_updated_at();
 CREATE TABLE IF NOT EXISTS budgets (
     id           BIGSERIAL PRIMARY KEY,
     user_id      BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-    category     VARCHAR(100) NOT NULL,
+    category_id  INTEGER NOT NULL REFERENCES categories(id),
     amount       NUMERIC(12,2) NOT NULL CHECK (amount >= 0),
     period_month SMALLINT NOT NULL CHECK (period_month BETWEEN 1 AND 12),
     period_year  SMALLINT NOT NULL CHECK (period_year >= 2000),
     created_at   TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-    UNIQUE (user_id, category, period_month, period_year)
+    UNIQUE (user_id, category_id, period_month, period_year)
 );
 
 CREATE INDEX IF NOT EXISTS idx_budgets_user_period
@@ -0,0 +1,244 @@
+# app/admission.py
+"""
+Per-user admission control in front of the DB pool.
+
+Each request of a logged-in user is admitted under one of two budgets:
+"expensive" (dashboard aggregates, exports, imports, search, batches and any
+request with ?limit= above ADMISSION_LARGE_LIMIT) or "cheap" (everything else).
+Per user and budget there is
+
+- a token bucket: ADMISSION_<BUDGET>_RATE requests per second, bursts of
+  ADMISSION_<BUDGET>_BURST;
+- a concurrency limit: ADMISSION_<BUDGET>_CONCURRENCY requests in flight.
+
+A request over either limit waits in line, for at most ADMISSION_QUEUE_TIMEOUT
+seconds and behind at most ADMISSION_QUEUE_SIZE others. Past that it is answered
+429 with Retry-After. The slot is held until the response is sent, streamed
+exports included, so one user can't occupy more than their concurrency of a
+worker's pooled connections.
+
+State lives in the worker process: with several workers, each enforces the
+limits on its own.
+"""
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.config import settings
+from app.metrics import LATENCY_BUCKETS, route_label
+
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Requests answered 429 by admission control", ["budget", "reason"]
+)
+ADMISSION_WAIT = Histogram(
+    "admission_queue_wait_seconds", "Time admitted requests waited for a token or a slot", ["budget"],
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_WAITING = Gauge(
+    "admission_waiting", "Requests waiting to be admitted", ["budget"], multiprocess_mode="livesum"
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight", "Admitted requests being served", ["budget"], multiprocess_mode="livesum"
+)
+
+# route templates (as in the http_* metrics) served under the "expensive" budget
+EXPENSIVE_ROUTES = {
+    "/dashboard/summary",
+    "/dashboard/recent",
+    "/dashboard/category-expense",
+    "/dashboard/monthly-trend",
+    "/dashboard/overview",
+    "/dashboard/timeseries",
+    "/transactions/export",
+    "/transactions/import",
+    "/transactions/search",
+    "/transactions/batch",
+    "/budgets/spent",
+    "/budgets/status",
+    "/budgets/batch",
+}
+
+
+def request_budget(request: Request) -> str:
+    """
+    "expensive" or "cheap" for this request.
+    """
+    if route_label(request.scope) in EXPENSIVE_ROUTES:
+        return "expensive"
+    limit = request.query_params.get("limit", "")
+    if limit.isdigit() and int(limit) > settings.ADMISSION_LARGE_LIMIT:
+        return "expensive"
+    return "cheap"
+
+
+class Limits:
+    def __init__(self, rate: float, burst: int, concurrency: int):
+        self.rate = rate  # requests per second; 0 = no rate limit
+        self.burst = burst
+        self.concurrency = concurrency  # 0 = no concurrency limit
+
+
+class TokenBucket:
+    """
+    Tokens may go negative: each waiting request has reserved the token it
+    will get once the bucket refills, so waiters are served in arrival order.
+    """
+    def __init__(self, rate: float, burst: int, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._clock = clock
+        self._updated = clock()
+
+    def reserve(self) -> float:
+        """
+        Take a token; returns the seconds until it is actually available (0 = now).
+        """
+        now = self._clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    def cancel(self) -> None:
+        self.tokens += 1
+
+    def full(self) -> bool:
+        return self.tokens + (self._clock() - self._updated) * self.rate >= self.burst
+
+
+class _Lane:
+    """
+    One user's limits for one budget.
+    """
+    def __init__(self, limits: Limits, clock):
+        self.bucket = TokenBucket(limits.rate, limits.burst, clock) if limits.rate else None
+        self.slots = asyncio.Semaphore(limits.concurrency) if limits.concurrency else None
+        self.waiting = 0
+        self.in_flight = 0
+
+    def idle(self) -> bool:
+        return not self.waiting and not self.in_flight and (self.bucket is None or self.bucket.full())
+
+
+def _too_many(budget: str, reason: str, retry_after: float) -> HTTPException:
+    ADMISSION_REJECTED.labels(budget, reason).inc()
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        limits: Dict[str, Limits],
+        queue_timeout: float = 2.0,
+        queue_size: int = 20,
+        max_users: int = 10000,
+        clock=time.monotonic,
+    ):
+        self.limits = limits
+        self.queue_timeout = queue_timeout
+        self.queue_size = queue_size
+        self.max_users = max_users
+        self._clock = clock
+        self._lanes: Dict[tuple, _Lane] = {}
+
+    def _lane(self, user_id, budget: str) -> _Lane:
+        key = (user_id, budget)
+        lane = self._lanes.get(key)
+        if lane is None:
+            if len(self._lanes) >= self.max_users:
+                # forget users with nothing pending and a full bucket
+                for stale in [k for k, l in self._lanes.items() if l.idle()]:
+                    del self._lanes[stale]
+            lane = self._lanes[key] = _Lane(self.limits[budget], self._clock)
+        return lane
+
+    @asynccontextmanager
+    async def admit(self, user_id, budget: str):
+        """
+        Hold one of the user's `budget` slots for the duration of the block,
+        or raise 429.
+        """
+        lane = self._lane(user_id, budget)
+        started = self._clock()
+        wait = lane.bucket.reserve() if lane.bucket is not None else 0.0
+        if wait > self.queue_timeout:
+            lane.bucket.cancel()
+            raise _too_many(budget, "rate", wait)
+        must_queue = wait > 0 or (lane.slots is not None and lane.slots.locked())
+        if must_queue and lane.waiting >= self.queue_size:
+            if lane.bucket is not None:
+                lane.bucket.cancel()
+            raise _too_many(budget, "queue_full", max(wait, self.queue_timeout))
+
+        if not must_queue:
+            if lane.slots is not None:
+                await lane.slots.acquire()  # a slot is free: returns without suspending
+        else:
+            lane.waiting += 1
+            ADMISSION_WAITING.labels(budget).inc()
+            try:
+                if wait:
+                    await asyncio.sleep(wait)
+                if lane.slots is not None:
+                    remaining = self.queue_timeout - (self._clock() - started)
+                    try:
+                        await asyncio.wait_for(lane.slots.acquire(), max(remaining, 0))
+                    except asyncio.TimeoutError:
+                        if lane.bucket is not None:
+                            lane.bucket.cancel()
+                        raise _too_many(budget, "concurrency", self.queue_timeout)
+            finally:
+                lane.waiting -= 1
+                ADMISSION_WAITING.labels(budget).dec()
+        ADMISSION_WAIT.labels(budget).observe(self._clock() - started)
+
+        lane.in_flight += 1
+        ADMISSION_IN_FLIGHT.labels(budget).inc()
+        try:
+            yield
+        finally:
+            lane.in_flight -= 1
+            ADMISSION_IN_FLIGHT.labels(budget).dec()
+            if lane.slots is not None:
+                lane.slots.release()
+
+
+admission = AdmissionController(
+    {
+        "cheap": Limits(
+            settings.ADMISSION_CHEAP_RATE, settings.ADMISSION_CHEAP_BURST, settings.ADMISSION_CHEAP_CONCURRENCY
+        ),
+        "expensive": Limits(
+            settings.ADMISSION_EXPENSIVE_RATE,
+            settings.ADMISSION_EXPENSIVE_BURST,
+            settings.ADMISSION_EXPENSIVE_CONCURRENCY,
+        ),
+    },
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+    queue_size=settings.ADMISSION_QUEUE_SIZE,
+)
+
+
+def admission_control(current_user_dependency, budget: Optional[str] = None):
+    """
+    Build a router / route dependency that admits the request under the user's
+    `budget` (default: `request_budget`) for as long as it is being served.
+    """
+    async def dependency(request: Request, current_user = Depends(current_user_dependency)):
+        if not settings.ADMISSION_CONTROL:
+            yield
+            return
+        async with admission.admit(current_user.id, budget or request_budget(request)):
+            yield
+
+    return dependency
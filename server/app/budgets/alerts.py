@@ -0,0 +1,149 @@
+# app/budgets/alerts.py
+"""
+Background budget-threshold alerts.
+
+Write endpoints call `alert_queue.enqueue(user_id, category_id)`, which is
+non-blocking. Duplicate (user, category) events waiting in the queue are
+coalesced. A single asyncio worker drains the queue in batches, evaluates every
+affected budget for its current period with one query per batch, and records
+an alert the first time a budget crosses each threshold in that period.
+"""
+import asyncio
+import logging
+import time
+from datetime import date
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.budgets.models import BudgetAlert
+from app.budgets.status import budget_spending_query, period_bounds
+from app.config import settings
+from app.db import async_session_maker
+
+logger = logging.getLogger("app.budgets.alerts")
+
+ALERT_QUEUE_DEPTH = Gauge(
+    "budget_alert_queue_depth", "Pending (user, category) alert evaluations", multiprocess_mode="livesum"
+)
+ALERT_EVENTS = Counter("budget_alert_events_total", "Alert events by outcome", ["outcome"])
+ALERT_LAG = Histogram(
+    "budget_alert_evaluation_lag_seconds", "Time from enqueue to evaluation",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+ALERT_BATCH_SECONDS = Histogram("budget_alert_batch_seconds", "Time to evaluate one batch")
+
+
+def evaluate_thresholds(budget, spent, today: date, thresholds) -> list:
+    """
+    Alert rows for every threshold `budget` has reached in its current period.
+    """
+    amount = float(budget.amount)
+    if amount <= 0:
+        return []
+    percent = float(spent) / amount * 100
+    period_start, _ = period_bounds(budget.period, today)
+    return [
+        {
+            "user_id": budget.user_id,
+            "budget_id": budget.id,
+            "category": budget.category,
+            "period_start": period_start,
+            "threshold": threshold,
+            "spent": spent,
+            "amount": budget.amount,
+        }
+        for threshold in thresholds
+        if percent >= threshold
+    ]
+
+
+class AlertQueue:
+    def __init__(self, maxsize: int = 10000, batch_size: int = 200, coalesce_seconds: float = 0.5):
+        self.batch_size = batch_size
+        self.coalesce_seconds = coalesce_seconds
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._pending: dict = {}  # (user_id, category_id) -> enqueue time
+        self._task = None
+
+    def enqueue(self, user_id, category_id: int) -> None:
+        key = (user_id, category_id)
+        if key in self._pending:
+            ALERT_EVENTS.labels("coalesced").inc()
+            return
+        try:
+            self._queue.put_nowait(key)
+        except asyncio.QueueFull:
+            ALERT_EVENTS.labels("dropped").inc()
+            return
+        self._pending[key] = time.monotonic()
+        ALERT_EVENTS.labels("enqueued").inc()
+        ALERT_QUEUE_DEPTH.set(len(self._pending))
+
+    async def _next_batch(self) -> list:
+        keys = [await self._queue.get()]
+        # give bursts of writes a moment to coalesce into the same batch
+        await asyncio.sleep(self.coalesce_seconds)
+        while len(keys) < self.batch_size and not self._queue.empty():
+            keys.append(self._queue.get_nowait())
+
+        now = time.monotonic()
+        for key in keys:
+            ALERT_LAG.observe(now - self._pending.pop(key, now))
+        ALERT_QUEUE_DEPTH.set(len(self._pending))
+        return keys
+
+    async def evaluate(self, keys: list) -> int:
+        """
+        Evaluate all budgets matching the (user, category) keys; returns alerts written.
+        """
+        today = date.today()
+        async with async_session_maker() as session:
+            result = await session.execute(budget_spending_query(today, user_categories=keys))
+            rows = [
+                alert
+                for budget, spent in result.all()
+                for alert in evaluate_thresholds(budget, spent, today, settings.ALERT_THRESHOLDS)
+            ]
+            if not rows:
+                return 0
+            stmt = pg_insert(BudgetAlert).values(rows).on_conflict_do_nothing(
+                index_elements=["budget_id", "period_start", "threshold"]
+            )
+            result = await session.execute(stmt)
+            await session.commit()
+            return result.rowcount
+
+    async def run(self) -> None:
+        while True:
+            keys = await self._next_batch()
+            started = time.perf_counter()
+            try:
+                written = await self.evaluate(keys)
+                ALERT_EVENTS.labels("evaluated").inc(len(keys))
+                if written:
+                    logger.info("budget alerts: %d new from %d events", written, len(keys))
+            except Exception:
+                ALERT_EVENTS.labels("failed").inc(len(keys))
+                logger.exception("budget alert evaluation failed for %d events", len(keys))
+            ALERT_BATCH_SECONDS.observe(time.perf_counter() - started)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+alert_queue = AlertQueue(
+    maxsize=settings.ALERT_QUEUE_MAX,
+    batch_size=settings.ALERT_BATCH_SIZE,
+    coalesce_seconds=settings.ALERT_COALESCE_SECONDS,
+)
@@ -1,9 +1,10 @@
 # app/budgets/models.py
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Numeric, DateTime, func, ForeignKey
+from sqlalchemy.orm import Mapped, column_property, mapped_column
+from sqlalchemy import String, Numeric, Date, DateTime, Integer, func, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 import uuid
 from typing import Optional
+from app.categories.models import category_name
 from app.db import Base
 
 class Budget(Base):
@@ -18,7 +19,8 @@ class Budget(Base):
         index=True
     )
 
-    category: Mapped[str] = mapped_column(String(100), nullable=False)
+    category_id: Mapped[int] = mapped_column(ForeignKey("categories.id"), nullable=False)
+    category: Mapped[str] = column_property(category_name(category_id))  # name, for reads
     amount: Mapped[Numeric] = mapped_column(Numeric(12, 2), nullable=False)
     period: Mapped[str] = mapped_column(String(20), nullable=False)  
     # period examples: "MONTHLY", "WEEKLY", "YEARLY"
@@ -36,4 +38,44 @@ class Budget(Base):
     )
 
     def __repr__(self) -> str:
-        return f"<Budget id={self.id} user_id={self.user_id} cat={self.category} amount={self.amount}>"
\ No newline at end of file
+        return f"<Budget id={self.id} user_id={self.user_id} cat={self.category} amount={self.amount}>"
+
+
+class BudgetAlert(Base):
+    """
+    A budget crossing a threshold (percent of its amount) within one period.
+    Written by the background evaluator in app/budgets/alerts.py.
+    """
+    __tablename__ = "budget_alerts"
+    __table_args__ = (
+        # one alert per budget, period and threshold
+        UniqueConstraint("budget_id", "period_start", "threshold", name="uq_budget_alerts_budget_period_threshold"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("user.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    budget_id: Mapped[int] = mapped_column(
+        ForeignKey("budgets.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    category: Mapped[str] = mapped_column(String(100), nullable=False)  # name when the alert fired
+    period_start: Mapped[Date] = mapped_column(Date, nullable=False)
+    threshold: Mapped[int] = mapped_column(Integer, nullable=False)  # percent, e.g. 80 or 100
+    spent: Mapped[Numeric] = mapped_column(Numeric(12, 2), nullable=False)
+    amount: Mapped[Numeric] = mapped_column(Numeric(12, 2), nullable=False)
+
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<BudgetAlert id={self.id} budget_id={self.budget_id} threshold={self.threshold}>"
@@ -1,20 +1,38 @@
 # app/budgets/router.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, select, insert, update, delete
 from datetime import date
+from typing import Optional
 from sqlalchemy import func
 
+from app.admission import admission_control
+from app.budgets.alerts import alert_queue
+from app.cache import response_cache
+from app.categories.lookup import id_of, replace_names
+from app.categories.models import Category
+from app.currencies.models import ExchangeRate
+from app.currencies.rates import converted, rate_cache
+from app.currencies.schemas import CURRENCY_PATTERN
 from app.db import async_session_maker
+from app.replica import read_router
+from app.repository import OwnedRepository
 from app.budgets import models, schemas
 from app.users.router import fastapi_users
-from app.transactions.models import Transaction
+from app.budgets.status import budget_spending_query, period_bounds
+from app.transactions.rollups import months_to_date
+from app.watermarks import conditional_get, touch
 
 # same dependency as transactions router
 current_active_user = fastapi_users.current_user(active=True)
 
-router = APIRouter(prefix="/budgets", tags=["budgets"])
+# per-user rate / concurrency limits, see app/admission.py
+router = APIRouter(
+    prefix="/budgets", tags=["budgets"], dependencies=[Depends(admission_control(current_active_user))]
+)
+
+repo = OwnedRepository(models.Budget, not_found="Budget not found")
 
 
 # session helper (same as transactions)
@@ -23,12 +41,32 @@ async def get_session() -> AsyncSession:
         yield session
 
 
+# GET handlers read through here: replica when configured, primary after the user's own writes
+async def get_read_session(current_user = Depends(current_active_user)) -> AsyncSession:
+    async with read_router.session(current_user.id) as session:
+        yield session
+
+
+budgets_etag = conditional_get("budgets", get_read_session, current_active_user)
+
+
+# spending is derived from the user's transactions (status also from their
+# budgets), in converted amounts; cached handlers take these headers as
+# cache_headers, so a write or a rates update on any worker changes the key
+spent_etag = conditional_get(
+    "transactions", get_read_session, current_active_user, vary=rate_cache.current_version
+)
+status_etag = conditional_get(
+    ("budgets", "transactions"), get_read_session, current_active_user, vary=rate_cache.current_version
+)
+
+
 # -----------------------------------
 # GET ALL budgets for logged-in user
 # -----------------------------------
-@router.get("/", response_model=list[schemas.BudgetRead])
+@router.get("/", response_model=list[schemas.BudgetRead], dependencies=[Depends(budgets_etag)])
 async def list_budgets(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user = Depends(current_active_user)
 ):
     query = select(models.Budget).where(models.Budget.user_id == current_user.id)
@@ -45,16 +83,14 @@ async def create_budget(
     session: AsyncSession = Depends(get_session),
     current_user = Depends(current_active_user)
 ):
-    budget = models.Budget(
-        user_id=current_user.id,
-        category=payload.category,
-        amount=payload.amount,
-        period=payload.period
-    )
+    values = payload.model_dump()
+    await replace_names(session, current_user.id, [values])
+    budget = await repo.create(session, current_user.id, values)
+    await touch(session, current_user.id, "budgets")
 
-    session.add(budget)
     await session.commit()
-    await session.refresh(budget)
+    await response_cache.invalidate_user(current_user.id, "budgets")
+    alert_queue.enqueue(current_user.id, budget.category_id)
     return budget
 
 
@@ -68,19 +104,14 @@ async def update_budget(
     session: AsyncSession = Depends(get_session),
     current_user = Depends(current_active_user)
 ):
-    query = select(models.Budget).where(models.Budget.id == budget_id)
-    result = await session.execute(query)
-    budget = result.scalar_one_or_none()
-
-    if not budget or budget.user_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Budget not found")
-
     updates = payload.model_dump(exclude_unset=True)
-    for key, value in updates.items():
-        setattr(budget, key, value)
+    await replace_names(session, current_user.id, [updates])
+    budget = await repo.update(session, budget_id, current_user.id, updates)
+    await touch(session, current_user.id, "budgets")
 
     await session.commit()
-    await session.refresh(budget)
+    await response_cache.invalidate_user(current_user.id, "budgets")
+    alert_queue.enqueue(current_user.id, budget.category_id)
     return budget
 
 
@@ -93,48 +124,241 @@ async def delete_budget(
     session: AsyncSession = Depends(get_session),
     current_user = Depends(current_active_user)
 ):
-    query = select(models.Budget).where(models.Budget.id == budget_id)
-    result = await session.execute(query)
-    budget = result.scalar_one_or_none()
+    await repo.delete(session, budget_id, current_user.id)
+    await touch(session, current_user.id, "budgets")
+    await session.commit()
+    await response_cache.invalidate_user(current_user.id, "budgets")
+    return None
+
+# -----------------------------------
+# BATCH (creates / updates / deletes / filter-based bulk changes)
+# -----------------------------------
+def _bulk_conditions(current_user, bulk_filter: schemas.BudgetBulkFilter) -> list:
+    conditions = [models.Budget.user_id == current_user.id]
+    if bulk_filter.category:
+        conditions.append(models.Budget.category_id == id_of(current_user.id, bulk_filter.category))
+    if bulk_filter.period:
+        conditions.append(func.upper(models.Budget.period) == bulk_filter.period.upper())
+    if len(conditions) == 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bulk filter needs at least one condition",
+        )
+    return conditions
+
+
+@router.post("/batch", response_model=schemas.BudgetBatchResult)
+async def batch_budgets(
+    payload: schemas.BudgetBatch,
+    session: AsyncSession = Depends(get_session),
+    current_user = Depends(current_active_user)
+):
+    """
+    Apply many budget changes in one DB transaction, in this order: create,
+    update, delete, update_where, delete_where. Each list is one set-based
+    statement; per-item results follow request order, unknown ids are not_found.
+    """
+    Budget = models.Budget
+    update_conditions = (
+        _bulk_conditions(current_user, payload.update_where.filter) if payload.update_where else None
+    )
+    delete_conditions = (
+        _bulk_conditions(current_user, payload.delete_where) if payload.delete_where else None
+    )
+    results = []
+    touched = set()  # category ids whose alerts need re-evaluating
+
+    if payload.create:
+        rows = [{"user_id": current_user.id, **item.model_dump()} for item in payload.create]
+        await replace_names(session, current_user.id, rows)
+        result = await session.execute(
+            insert(Budget).returning(Budget.id, sort_by_parameter_order=True), rows
+        )
+        for i, budget_id in enumerate(result.scalars()):
+            results.append({"op": "create", "index": i, "id": budget_id, "status": "created"})
+        touched.update(row["category_id"] for row in rows)
+
+    if payload.update:
+        result = await session.execute(
+            select(Budget.id, Budget.category_id)
+            .where(Budget.user_id == current_user.id, Budget.id.in_({item.id for item in payload.update}))
+            .with_for_update()
+        )
+        categories = dict(result.all())
+        item_changes = [
+            item.model_dump(exclude_unset=True, exclude={"id"}) if item.id in categories else None
+            for item in payload.update
+        ]
+        await replace_names(session, current_user.id, [changes for changes in item_changes if changes])
+        params = {}
+        for i, item in enumerate(payload.update):
+            if item.id not in categories:
+                results.append({"op": "update", "index": i, "id": item.id, "status": "not_found"})
+                continue
+            changes = item_changes[i]
+            if changes:
+                params.setdefault(item.id, {}).update(changes)
+                touched.add(changes.get("category_id", categories[item.id]))
+            results.append({"op": "update", "index": i, "id": item.id, "status": "updated"})
+        # one executemany per set of changed columns; ownership was checked above
+        table = Budget.__table__
+        groups = {}
+        for budget_id, changes in params.items():
+            row = {"b_id": budget_id}
+            row.update({f"v_{column}": value for column, value in changes.items()})
+            groups.setdefault(tuple(sorted(changes)), []).append(row)
+        for columns, rows in groups.items():
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values({column: bindparam(f"v_{column}") for column in columns})
+                .values(updated_at=func.now())
+            )
+            await session.execute(stmt, rows)
 
-    if not budget or budget.user_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Budget not found")
+    if payload.delete:
+        result = await session.execute(
+            delete(Budget)
+            .where(Budget.user_id == current_user.id, Budget.id.in_(set(payload.delete)))
+            .returning(Budget.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = set(result.scalars())
+        for i, budget_id in enumerate(payload.delete):
+            found = budget_id in deleted
+            deleted.discard(budget_id)
+            results.append({
+                "op": "delete", "index": i, "id": budget_id,
+                "status": "deleted" if found else "not_found",
+            })
 
-    await session.delete(budget)
+    updated_where = deleted_where = 0
+    changes = payload.update_where.values.model_dump(exclude_unset=True) if payload.update_where else {}
+    if update_conditions and changes:
+        await replace_names(session, current_user.id, [changes])
+        result = await session.execute(
+            update(Budget)
+            .where(*update_conditions)
+            .values(**changes, updated_at=func.now())
+            .returning(Budget.category_id)
+            .execution_options(synchronize_session=False)
+        )
+        updated = result.scalars().all()
+        updated_where = len(updated)
+        touched.update(updated)
+    if delete_conditions:
+        result = await session.execute(
+            delete(Budget)
+            .where(*delete_conditions)
+            .execution_options(synchronize_session=False)
+        )
+        deleted_where = result.rowcount
+
+    changed = updated_where or deleted_where or any(r["status"] != "not_found" for r in results)
+    if changed:
+        await touch(session, current_user.id, "budgets")
     await session.commit()
-    return None
+
+    if changed:
+        await response_cache.invalidate_user(current_user.id, "budgets")
+    for category_id in touched:
+        alert_queue.enqueue(current_user.id, category_id)
+    return {"results": results, "updated_where": updated_where, "deleted_where": deleted_where}
+
 
 # -----------------------------------
 # SPENT AMOUNT PER CATEGORY (CURRENT MONTH)
 # -----------------------------------
 @router.get("/spent")
+@response_cache.cached("budgets")
 async def get_spent_by_category(
-    session: AsyncSession = Depends(get_session),
-    current_user = Depends(current_active_user)
+    currency: Optional[str] = Query(None, pattern=CURRENCY_PATTERN, description="Defaults to the base currency"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user = Depends(current_active_user),
+    cache_headers: dict = Depends(spent_etag),
 ):
     """
-    Returns spending totals per category for the current month.
+    Returns spending totals per category for the current month up to today, in `currency`.
     Only EXPENSE transactions are counted.
     """
 
     today = date.today()
     first_day = date(today.year, today.month, 1)
+    rate = await rate_cache.rate(session, currency)
 
+    M = months_to_date(current_user.id, first_day, today)
     query = (
         select(
-            Transaction.category,
-            func.sum(Transaction.amount)
+            Category.name,
+            func.sum(converted(M.c.total, rate))
         )
-        .where(
-            Transaction.user_id == current_user.id,
-            Transaction.type == "EXPENSE",
-            Transaction.date >= first_day,
-            Transaction.date <= today
-        )
-        .group_by(Transaction.category)
+        .select_from(M)
+        .join(ExchangeRate, ExchangeRate.currency == M.c.currency)
+        .join(Category, Category.id == M.c.category_id)
+        .where(M.c.type == "EXPENSE")
+        .group_by(Category.id, Category.name)
+        .having(func.sum(M.c.tx_count) > 0)
     )
 
     result = await session.execute(query)
     rows = result.all()
 
-    return {category: float(total or 0) for category, total in rows}
\ No newline at end of file
+    return {category: float(total or 0) for category, total in rows}
+
+
+# -----------------------------------
+# STATUS PER BUDGET (OWN PERIOD WINDOW)
+# -----------------------------------
+@router.get("/status", response_model=list[schemas.BudgetStatus])
+@response_cache.cached("budgets")
+async def get_budget_status(
+    session: AsyncSession = Depends(get_read_session),
+    current_user = Depends(current_active_user),
+    cache_headers: dict = Depends(status_etag),
+):
+    """
+    Every budget with spent / remaining / percent_used for its own current
+    period (week, month or year), up to today, computed in one statement.
+    """
+    today = date.today()
+    query = budget_spending_query(today, user_ids=[current_user.id])
+
+    result = await session.execute(query)
+
+    statuses = []
+    for budget, spent_amount in result.all():
+        period_start, period_end = period_bounds(budget.period, today)
+        amount = float(budget.amount)
+        spent_amount = float(spent_amount)
+        statuses.append({
+            **schemas.BudgetRead.model_validate(budget).model_dump(),
+            "period_start": period_start,
+            "period_end": period_end,
+            "spent": spent_amount,
+            "remaining": amount - spent_amount,
+            "percent_used": round(spent_amount / amount * 100, 1) if amount else None,
+        })
+    return statuses
+
+
+# -----------------------------------
+# THRESHOLD ALERTS
+# -----------------------------------
+@router.get("/alerts", response_model=list[schemas.BudgetAlertRead])
+async def list_alerts(
+    limit: int = Query(50, ge=1, le=500),
+    session: AsyncSession = Depends(get_read_session),
+    current_user = Depends(current_active_user)
+):
+    """
+    Budget threshold alerts (e.g. 80% / 100% reached), newest first.
+    Produced asynchronously after transaction and budget writes.
+    """
+    query = (
+        select(models.BudgetAlert)
+        .where(models.BudgetAlert.user_id == current_user.id)
+        .order_by(models.BudgetAlert.created_at.desc(), models.BudgetAlert.id.desc())
+        .limit(limit)
+    )
+    result = await session.execute(query)
+    return result.scalars().all()
@@ -1,10 +1,12 @@
 # app/budgets/schemas.py
 from __future__ import annotations
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 import datetime
 
+from app.transactions.schemas import BATCH_MAX_ITEMS, BatchItemResult
+
 class BudgetCreate(BaseModel):
     category: str = Field(..., example="Food")
     amount: float = Field(..., ge=0)
@@ -24,4 +26,52 @@ class BudgetRead(BaseModel):
     amount: float
     period: str
     created_at: datetime.datetime
-    updated_at: datetime.datetime
\ No newline at end of file
+    updated_at: datetime.datetime
+
+class BudgetStatus(BudgetRead):
+    period_start: datetime.date
+    period_end: datetime.date
+    spent: float
+    remaining: float
+    percent_used: Optional[float] = None
+
+
+class BudgetAlertRead(BaseModel):
+    model_config = {"from_attributes": True}
+
+    id: int
+    budget_id: int
+    category: str
+    period_start: datetime.date
+    threshold: int
+    spent: float
+    amount: float
+    created_at: datetime.datetime
+
+
+class BudgetBatchUpdate(BudgetUpdate):
+    id: int
+
+
+class BudgetBulkFilter(BaseModel):
+    category: Optional[str] = None
+    period: Optional[str] = None
+
+
+class BudgetBulkUpdate(BaseModel):
+    filter: BudgetBulkFilter
+    values: BudgetUpdate
+
+
+class BudgetBatch(BaseModel):
+    create: List[BudgetCreate] = Field([], max_length=BATCH_MAX_ITEMS)
+    update: List[BudgetBatchUpdate] = Field([], max_length=BATCH_MAX_ITEMS)
+    delete: List[int] = Field([], max_length=BATCH_MAX_ITEMS)
+    update_where: Optional[BudgetBulkUpdate] = None
+    delete_where: Optional[BudgetBulkFilter] = None
+
+
+class BudgetBatchResult(BaseModel):
+    results: List[BatchItemResult]
+    updated_where: int = 0
+    deleted_where: int = 0
@@ -0,0 +1,90 @@
+# app/budgets/status.py
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import select, func, case, tuple_
+
+from app.budgets.models import Budget
+from app.currencies.models import ExchangeRate
+from app.currencies.rates import to_base
+from app.transactions.models import Transaction
+
+
+def period_bounds(period: str, today: date) -> tuple[date, date]:
+    """
+    Current window of a budget period: ISO week (Mon-Sun), calendar month or year.
+    Unknown periods are treated as MONTHLY.
+    """
+    period = (period or "").upper()
+    if period == "WEEKLY":
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=6)
+    if period == "YEARLY":
+        return date(today.year, 1, 1), date(today.year, 12, 31)
+    start = date(today.year, today.month, 1)
+    return start, start + relativedelta(months=1) - timedelta(days=1)
+
+
+def budget_spending_query(
+    today: date,
+    user_ids: Optional[Iterable] = None,
+    user_categories: Optional[Iterable[tuple]] = None,
+):
+    """
+    SELECT (Budget, spent) where spent covers the budget's own current period.
+
+    One statement: EXPENSE transactions since the earliest window start are
+    aggregated per (user, category) with a FILTERed sum per window, then joined
+    to budgets. Amounts are converted to the base currency budgets are kept in.
+    Restrict with `user_ids` and/or `user_categories` ((user_id, category_id)
+    pairs) to evaluate many users' budgets at once.
+    """
+    week_start, _ = period_bounds("WEEKLY", today)
+    month_start, _ = period_bounds("MONTHLY", today)
+    year_start, _ = period_bounds("YEARLY", today)
+
+    amount = to_base(Transaction.amount)
+    spent = (
+        select(
+            Transaction.user_id,
+            Transaction.category_id,
+            func.sum(amount).filter(Transaction.date >= week_start).label("weekly"),
+            func.sum(amount).filter(Transaction.date >= month_start).label("monthly"),
+            func.sum(amount).filter(Transaction.date >= year_start).label("yearly"),
+        )
+        .join(ExchangeRate, ExchangeRate.currency == Transaction.currency)
+        .where(
+            Transaction.type == "EXPENSE",
+            Transaction.date >= min(week_start, year_start),
+            Transaction.date <= today
+        )
+        .group_by(Transaction.user_id, Transaction.category_id)
+    )
+
+    query = select(Budget)
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        spent = spent.where(Transaction.user_id.in_(user_ids))
+        query = query.where(Budget.user_id.in_(user_ids))
+    if user_categories is not None:
+        pairs = list(user_categories)
+        spent = spent.where(tuple_(Transaction.user_id, Transaction.category_id).in_(pairs))
+        query = query.where(tuple_(Budget.user_id, Budget.category_id).in_(pairs))
+
+    spent = spent.subquery()
+    period = func.upper(Budget.period)
+    spent_in_period = case(
+        (period == "WEEKLY", spent.c.weekly),
+        (period == "YEARLY", spent.c.yearly),
+        else_=spent.c.monthly,
+    )
+
+    return (
+        query.add_columns(func.coalesce(spent_in_period, 0).label("spent"))
+        .outerjoin(
+            spent,
+            (spent.c.user_id == Budget.user_id) & (spent.c.category_id == Budget.category_id),
+        )
+        .order_by(Budget.id)
+    )
@@ -0,0 +1,211 @@
+# app/cache.py
+"""
+Per-user response cache for read endpoints.
+
+Cached handlers are keyed by (namespace, handler, user, query params, day) plus a
+per-user generation number. Write endpoints call `invalidate_user`, which bumps the
+generation so every older entry for that user/namespace becomes unreachable and is
+eventually evicted (LRU / TTL) without scanning the store.
+"""
+import functools
+import json
+import math
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+from prometheus_client import Counter
+
+from app.config import settings
+
+# on /metrics, summed over workers; stats() reports this process's counts
+CACHE_HITS = Counter("response_cache_hits", "Response cache hits")
+CACHE_MISSES = Counter("response_cache_misses", "Response cache misses")
+CACHE_INVALIDATIONS = Counter("response_cache_invalidations", "Response cache invalidations")
+
+
+class CacheBackend:
+    """
+    Minimal storage interface the response cache needs.
+    """
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        """
+        Atomically increment a counter that is never evicted; returns the new value.
+        """
+        raise NotImplementedError
+
+    async def get_counter(self, key: str) -> int:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process LRU with per-entry TTL. Counters are kept apart so they are never evicted.
+    """
+    def __init__(self, max_entries: int = 10000, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters: dict = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class KeyValueBackend(CacheBackend):
+    """
+    Adapter for a shared async key-value store with a Redis-like client
+    (`get`, `set(key, value, ex=ttl)`, `incr`). Values are stored as JSON so
+    every worker process sees the same entries and invalidations.
+    """
+    def __init__(self, client, prefix: str = "cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        await self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    async def incr(self, key: str) -> int:
+        return int(await self.client.incr(self.prefix + key))
+
+    async def get_counter(self, key: str) -> int:
+        raw = await self.client.get(self.prefix + key)
+        return int(raw or 0)
+
+
+class LocalKeyValueClient:
+    """
+    In-process stand-in for a shared store client, so KeyValueBackend can be
+    exercised locally without running Redis. Values live in a MemoryBackend,
+    with the same LRU / TTL bounds; counters are kept apart and never evicted.
+    """
+    def __init__(self, max_entries: int = 10000, clock=time.monotonic):
+        self._entries = MemoryBackend(max_entries=max_entries, clock=clock)
+        self._counters: dict = {}
+
+    async def get(self, key: str):
+        if key in self._counters:
+            return str(self._counters[key])
+        return await self._entries.get(key)
+
+    async def set(self, key: str, value, ex: Optional[int] = None):
+        await self._entries.set(key, value, math.inf if ex is None else ex)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, ttl: int = 60):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _generation_key(namespace: str, user_id) -> str:
+        return f"gen:{namespace}:{user_id}"
+
+    async def invalidate_user(self, user_id, *namespaces: str) -> None:
+        """
+        Drop every cached response of `user_id` in the given namespaces.
+        """
+        for namespace in namespaces:
+            await self.backend.incr(self._generation_key(namespace, user_id))
+            self.invalidations += 1
+            CACHE_INVALIDATIONS.inc()
+
+    def cached(self, namespace: str):
+        """
+        Decorator for route handlers that take `current_user` (and usually `session`).
+        All other keyword arguments become part of the cache key. Handlers behind a
+        `conditional_get` dependency take its headers as `cache_headers`, so the ETag
+        (and the watermark version in it) is part of the key too: a cached body is
+        never served under the ETag of a later or earlier version.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(**kwargs):
+                user_id = kwargs["current_user"].id
+                params = sorted(
+                    (k, str(v)) for k, v in kwargs.items() if k not in ("session", "current_user")
+                )
+                generation = await self.backend.get_counter(self._generation_key(namespace, user_id))
+                key = f"{namespace}:{func.__name__}:{user_id}:{generation}:{date.today()}:{params}"
+
+                value = await self.backend.get(key)
+                if value is not None:
+                    self.hits += 1
+                    CACHE_HITS.inc()
+                    return value
+
+                self.misses += 1
+                CACHE_MISSES.inc()
+                value = jsonable_encoder(await func(**kwargs))
+                await self.backend.set(key, value, self.ttl)
+                return value
+            return wrapper
+        return decorator
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "backend": type(self.backend).__name__,
+        }
+        if isinstance(self.backend, MemoryBackend):
+            stats["entries"] = len(self.backend)
+        return stats
+
+
+def _make_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "local-kv":
+        return KeyValueBackend(LocalKeyValueClient(max_entries=settings.CACHE_MAX_ENTRIES))
+    return MemoryBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(_make_backend(), ttl=settings.CACHE_TTL_SECONDS)
@@ -0,0 +1,63 @@
+# app/categories/lookup.py
+"""
+Translation between category names (what the API speaks) and Category ids
+(what transactions, budgets and rollups store).
+
+Write paths pass their value dicts through `replace_names`, which resolves
+all names in one statement and creates the ones the user doesn't have yet.
+Read filters compare ids through `id_of`.
+"""
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.categories.models import Category
+
+
+async def category_ids(session: AsyncSession, user_id, names: Iterable[str]) -> Dict[str, int]:
+    """
+    {name: id} for the user's categories, creating missing ones.
+    """
+    names = set(names)
+    ids: Dict[str, int] = {}
+    # a name inserted concurrently is skipped by ON CONFLICT but not yet visible
+    # to this statement's snapshot; the second round picks it up
+    for _ in range(2):
+        missing = sorted(names - ids.keys())
+        if not missing:
+            break
+        created = (
+            pg_insert(Category)
+            .values([{"user_id": user_id, "name": name} for name in missing])
+            .on_conflict_do_nothing(index_elements=[Category.user_id, Category.name])
+            .returning(Category.name, Category.id)
+            .cte("created")
+        )
+        existing = select(Category.name, Category.id).where(
+            Category.user_id == user_id, Category.name.in_(missing)
+        )
+        result = await session.execute(select(created.c.name, created.c.id).union_all(existing))
+        ids.update(result.all())
+    return ids
+
+
+async def replace_names(session: AsyncSession, user_id, rows: List[dict]) -> None:
+    """
+    In place: the "category" name of every row becomes its "category_id".
+    """
+    ids = await category_ids(session, user_id, (row["category"] for row in rows if row.get("category")))
+    for row in rows:
+        if "category" in row:
+            name = row.pop("category")
+            if name:
+                row["category_id"] = ids[name]
+
+
+def id_of(user_id, name: str):
+    """
+    Scalar subquery for the id of the user's category `name` (NULL, matching
+    nothing, if there is none).
+    """
+    return select(Category.id).where(Category.user_id == user_id, Category.name == name).scalar_subquery()
@@ -0,0 +1,45 @@
+# app/categories/models.py
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, DateTime, Integer, func, ForeignKey, UniqueConstraint, select
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+import uuid
+from app.db import Base
+
+class Category(Base):
+    """
+    Per-user category names. Transactions, budgets and rollups store the
+    integer id, so a rename is one row and grouping/joins use small keys.
+    """
+    __tablename__ = "categories"
+    __table_args__ = (
+        UniqueConstraint("user_id", "name", name="uq_categories_user_name"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("user.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<Category id={self.id} user_id={self.user_id} name={self.name}>"
+
+
+def category_name(category_id_column):
+    """
+    Scalar subquery for the name behind a category_id column (for column_property).
+    """
+    return (
+        select(Category.name)
+        .where(Category.id == category_id_column)
+        .correlate_except(Category)
+        .scalar_subquery()
+    )
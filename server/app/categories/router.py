@@ -0,0 +1,84 @@
+# app/categories/router.py
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+
+from app.admission import admission_control
+from app.cache import response_cache
+from app.db import async_session_maker
+from app.replica import read_router
+from app.categories import schemas
+from app.categories.models import Category
+from app.users.router import fastapi_users
+from app.watermarks import touch
+
+current_active_user = fastapi_users.current_user(active=True)
+
+# per-user rate / concurrency limits, see app/admission.py
+router = APIRouter(
+    prefix="/categories", tags=["categories"], dependencies=[Depends(admission_control(current_active_user))]
+)
+
+
+async def get_session() -> AsyncSession:
+    async with async_session_maker() as session:
+        yield session
+
+
+async def get_read_session(current_user = Depends(current_active_user)) -> AsyncSession:
+    async with read_router.session(current_user.id) as session:
+        yield session
+
+
+# -----------------------------
+# LIST
+# -----------------------------
+@router.get("/", response_model=list[schemas.CategoryRead])
+async def list_categories(
+    session: AsyncSession = Depends(get_read_session),
+    current_user = Depends(current_active_user),
+):
+    """
+    The user's categories. They are created implicitly by transactions and budgets.
+    """
+    result = await session.execute(
+        select(Category).where(Category.user_id == current_user.id).order_by(Category.name)
+    )
+    return result.scalars().all()
+
+
+# -----------------------------
+# RENAME
+# -----------------------------
+@router.put("/{category_id}", response_model=schemas.CategoryRead)
+async def rename_category(
+    category_id: int,
+    payload: schemas.CategoryUpdate,
+    session: AsyncSession = Depends(get_session),
+    current_user = Depends(current_active_user),
+):
+    """
+    Rename a category everywhere: one row changes, transactions and budgets
+    refer to it by id. Renaming onto an existing name is a 409. Renames don't
+    appear in /transactions/changes: synced rows carry category_id, so clients
+    re-read /categories and map ids to the new names.
+    """
+    await touch(session, current_user.id, "transactions", "budgets")
+    try:
+        result = await session.execute(
+            update(Category)
+            .where(Category.id == category_id, Category.user_id == current_user.id)
+            .values(name=payload.name)
+            .returning(Category)
+        )
+        category = result.scalar_one_or_none()
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Category already exists")
+    if category is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
+
+    await session.commit()
+    await response_cache.invalidate_user(current_user.id, "dashboard", "budgets")
+    return category
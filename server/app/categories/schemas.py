@@ -0,0 +1,11 @@
+# app/categories/schemas.py
+from pydantic import BaseModel, Field
+
+class CategoryRead(BaseModel):
+    model_config = {"from_attributes": True}
+
+    id: int
+    name: str
+
+class CategoryUpdate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100, example="Groceries")
@@ -0,0 +1,21 @@
+# app/currencies/models.py
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Numeric, DateTime, func
+from app.db import Base
+
+class ExchangeRate(Base):
+    """
+    Units of `currency` per one unit of settings.BASE_CURRENCY (whose own rate is 1).
+    """
+    __tablename__ = "exchange_rates"
+
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    rate: Mapped[Numeric] = mapped_column(Numeric(20, 10), nullable=False)
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<ExchangeRate {self.currency}={self.rate}>"
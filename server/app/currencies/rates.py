@@ -0,0 +1,202 @@
+# app/currencies/rates.py
+"""
+Exchange rates and conversion inside SQL aggregations.
+
+Transactions keep the currency they were entered in. Rates live in the
+exchange_rates table as units per one settings.BASE_CURRENCY, loaded from a
+JSON file or PUT /currencies/rates; no live rate service is called:
+
+    python -m app.currencies.rates rates.json
+
+The file is either {"base": "USD", "rates": {"EUR": 0.92, ...}} (the usual
+rate-API shape) or a plain {"EUR": 0.92, ...} mapping in the base currency.
+
+Aggregations join ExchangeRate on the row's currency and sum
+`converted(amount, target_rate)`, so a mixed-currency total is still one
+query. The target rate comes from `rate_cache`, an in-memory copy of the
+table that is reloaded every RATES_REFRESH_SECONDS, and whenever
+`rate_cache.current_version` sees that the table changed.
+"""
+import argparse
+import asyncio
+import json
+import re
+import time
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.currencies.models import ExchangeRate
+
+CURRENCY_CODE = re.compile(r"^[A-Z]{3}$")
+
+
+def converted(amount, target_rate: Decimal):
+    """
+    SQL expression for `amount` in the target currency; the query must join
+    ExchangeRate on the currency of `amount`.
+    """
+    # typed like the rates column; bound against `amount` it would be rounded to cents
+    return amount * literal(target_rate, ExchangeRate.rate.type) / ExchangeRate.rate
+
+
+def to_base(amount):
+    """
+    SQL expression for `amount` in the base currency (same join requirement).
+    """
+    return amount / ExchangeRate.rate
+
+
+class RateCache:
+    def __init__(self, refresh_seconds: float = 300, clock=time.monotonic):
+        self.refresh_seconds = refresh_seconds
+        self.rates: Dict[str, Decimal] = {}
+        self.updated_at = None  # newest updated_at in the table
+        self._clock = clock
+        self._loaded_at: Optional[float] = None
+
+    @property
+    def version(self) -> str:
+        """
+        Version of the loaded copy: changes whenever rates do.
+        """
+        return str(self.updated_at or "")
+
+    async def current_version(self, session: AsyncSession) -> str:
+        """
+        Version of the rates as stored in the table, reloading the copy first if
+        they changed (possibly on another worker). Part of the ETags and cache
+        keys of responses in converted amounts.
+        """
+        result = await session.execute(select(func.max(ExchangeRate.updated_at)))
+        if self._loaded_at is None or result.scalar() != self.updated_at:
+            await self.refresh(session)
+        return self.version
+
+    def _stale(self) -> bool:
+        return self._loaded_at is None or self._clock() - self._loaded_at >= self.refresh_seconds
+
+    async def refresh(self, session: AsyncSession) -> None:
+        result = await session.execute(
+            select(ExchangeRate.currency, ExchangeRate.rate, ExchangeRate.updated_at)
+        )
+        rows = result.all()
+        rates = {currency: rate for currency, rate, _ in rows}
+        rates.setdefault(settings.BASE_CURRENCY, Decimal(1))
+        self.rates = rates
+        self.updated_at = max((updated_at for _, _, updated_at in rows), default=None)
+        self._loaded_at = self._clock()
+
+    async def get(self, session: AsyncSession) -> Dict[str, Decimal]:
+        if self._stale():
+            await self.refresh(session)
+        return self.rates
+
+    async def require(self, session: AsyncSession, currencies: Iterable[str]) -> None:
+        """
+        400 unless every currency has a rate; a miss reloads the table once,
+        so rates added on another worker are picked up immediately.
+        """
+        currencies = set(currencies)
+        missing = currencies - (await self.get(session)).keys()
+        if missing:
+            await self.refresh(session)
+            missing = currencies - self.rates.keys()
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown currency: {', '.join(sorted(missing))}",
+            )
+
+    async def rate(self, session: AsyncSession, currency: Optional[str]) -> Decimal:
+        """
+        Rate of `currency` (default: the base currency), or 400 if unknown.
+        """
+        currency = currency or settings.BASE_CURRENCY
+        await self.require(session, [currency])
+        return self.rates[currency]
+
+
+rate_cache = RateCache(settings.RATES_REFRESH_SECONDS)
+
+
+def _rebased(rates: Dict[str, float], base: Optional[str]) -> Dict[str, Decimal]:
+    rates = {code.upper(): Decimal(str(rate)) for code, rate in rates.items()}
+    invalid = sorted(code for code, rate in rates.items() if not CURRENCY_CODE.match(code) or rate <= 0)
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid rates: {', '.join(invalid)}"
+        )
+
+    base = (base or settings.BASE_CURRENCY).upper()
+    if base != settings.BASE_CURRENCY:
+        # quoted against another currency: divide everything by the base currency's rate
+        if settings.BASE_CURRENCY not in rates:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Rates quoted in {base} must include {settings.BASE_CURRENCY}",
+            )
+        factor = rates[settings.BASE_CURRENCY]
+        rates = {code: rate / factor for code, rate in rates.items()}
+        rates[base] = 1 / factor
+    rates[settings.BASE_CURRENCY] = Decimal(1)
+    return rates
+
+
+async def store_rates(session: AsyncSession, rates: Dict[str, float], base: Optional[str] = None) -> int:
+    """
+    Upsert rates (currencies not mentioned keep theirs). Returns the number stored.
+    """
+    values = [{"currency": code, "rate": rate} for code, rate in _rebased(rates, base).items()]
+    stmt = pg_insert(ExchangeRate).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ExchangeRate.currency],
+        set_={"rate": stmt.excluded.rate, "updated_at": func.now()},
+    )
+    await session.execute(stmt)
+    return len(values)
+
+
+async def load_file(session: AsyncSession, path: str) -> int:
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data.get("rates"), dict):
+        return await store_rates(session, data["rates"], data.get("base"))
+    return await store_rates(session, data)
+
+
+async def init_rates(session: AsyncSession) -> None:
+    """
+    Migration step: make sure the base currency exists and load EXCHANGE_RATES_FILE, if set.
+    """
+    if settings.EXCHANGE_RATES_FILE:
+        await load_file(session, settings.EXCHANGE_RATES_FILE)
+    else:
+        await session.execute(
+            pg_insert(ExchangeRate)
+            .values(currency=settings.BASE_CURRENCY, rate=1)
+            .on_conflict_do_nothing(index_elements=[ExchangeRate.currency])
+        )
+
+
+async def _main(path: str) -> None:
+    from app.db import async_session_maker, dispose_engines, init_engines
+
+    init_engines()
+    async with async_session_maker() as session:
+        count = await load_file(session, path)
+        await session.commit()
+    await dispose_engines()
+    print(f"stored {count} rates (base {settings.BASE_CURRENCY})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load exchange rates from a JSON file")
+    parser.add_argument("path", help="JSON file with rates")
+    args = parser.parse_args()
+    asyncio.run(_main(args.path))
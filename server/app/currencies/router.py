@@ -0,0 +1,72 @@
+# app/currencies/router.py
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.admission import admission_control
+from app.config import settings
+from app.db import async_session_maker
+from app.replica import read_router
+from app.currencies import schemas
+from app.currencies.rates import rate_cache, store_rates
+from app.users.router import fastapi_users
+
+current_active_user = fastapi_users.current_user(active=True)
+current_superuser = fastapi_users.current_user(active=True, superuser=True)
+
+# per-user rate / concurrency limits, see app/admission.py
+router = APIRouter(
+    prefix="/currencies", tags=["currencies"], dependencies=[Depends(admission_control(current_active_user))]
+)
+
+
+async def get_session() -> AsyncSession:
+    async with async_session_maker() as session:
+        yield session
+
+
+async def get_read_session(current_user = Depends(current_active_user)) -> AsyncSession:
+    async with read_router.session(current_user.id) as session:
+        yield session
+
+
+async def _rates_payload(session: AsyncSession) -> dict:
+    rates = await rate_cache.get(session)
+    return {
+        "base": settings.BASE_CURRENCY,
+        "rates": {code: float(rate) for code, rate in sorted(rates.items())},
+        "updated_at": rate_cache.updated_at,
+    }
+
+
+# -----------------------------
+# LIST RATES
+# -----------------------------
+@router.get("/rates", response_model=schemas.RatesRead)
+async def get_rates(
+    session: AsyncSession = Depends(get_read_session),
+    current_user = Depends(current_active_user),
+):
+    """
+    Known currencies with their rate per one unit of the base currency.
+    """
+    return await _rates_payload(session)
+
+
+# -----------------------------
+# UPDATE RATES (superusers)
+# -----------------------------
+@router.put("/rates", response_model=schemas.RatesRead)
+async def update_rates(
+    payload: schemas.RatesUpdate,
+    session: AsyncSession = Depends(get_session),
+    current_user = Depends(current_superuser),
+):
+    """
+    Upsert rates; `base` defaults to the server's base currency and may be any
+    currency listed in `rates`. Currencies not mentioned keep their rate.
+    """
+    await store_rates(session, payload.rates, payload.base)
+    await session.commit()
+    await rate_cache.refresh(session)
+    return await _rates_payload(session)
@@ -0,0 +1,16 @@
+# app/currencies/schemas.py
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+import datetime
+
+CURRENCY_PATTERN = "^[A-Z]{3}$"
+
+class RatesUpdate(BaseModel):
+    # rates may be quoted against another currency, as long as it is in `rates`
+    base: Optional[str] = Field(None, pattern=CURRENCY_PATTERN, example="USD")
+    rates: Dict[str, float] = Field(..., example={"EUR": 0.92, "GBP": 0.79})
+
+class RatesRead(BaseModel):
+    base: str
+    rates: Dict[str, float]
+    updated_at: Optional[datetime.datetime] = None
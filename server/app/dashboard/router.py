@@ -1,46 +1,69 @@
 # app/dashboard/router.py
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, func, desc, case, and_, tuple_, cast, literal_column, true, Date, Float
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from datetime import date, datetime
+from typing import Optional
 from dateutil.relativedelta import relativedelta
 
-from app.db import async_session_maker
+from app.admission import admission_control
+from app.cache import response_cache
+from app.categories.models import Category
+from app.currencies.models import ExchangeRate
+from app.currencies.rates import converted, rate_cache
+from app.currencies.schemas import CURRENCY_PATTERN
+from app.replica import read_router
+from app.serialization import FastJSONResponse
 from app.users.router import fastapi_users
-from app.transactions.models import Transaction
-
-router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+from app.transactions.models import Transaction, TransactionMonthlyRollup
+from app.transactions.rollups import months_to_date
+from app.transactions.schemas import TransactionRead
+from app.watermarks import conditional_get
 
 current_active_user = fastapi_users.current_user(active=True)
 
-async def get_session() -> AsyncSession:
-    async with async_session_maker() as session:
+# per-user rate / concurrency limits, see app/admission.py
+router = APIRouter(
+    prefix="/dashboard", tags=["dashboard"], dependencies=[Depends(admission_control(current_active_user))]
+)
+
+# GET handlers read through here: replica when configured, primary after the user's own writes
+async def get_read_session(current_user = Depends(current_active_user)) -> AsyncSession:
+    async with read_router.session(current_user.id) as session:
         yield session
 
 
+# every dashboard payload is derived from the user's transactions (and the exchange rates)
+dashboard_etag = conditional_get(
+    "transactions", get_read_session, current_active_user, vary=rate_cache.current_version
+)
+
+
 @router.get("/summary")
+@response_cache.cached("dashboard")
 async def summary(
-    session: AsyncSession = Depends(get_session),
+    currency: Optional[str] = Query(None, pattern=CURRENCY_PATTERN, description="Defaults to the base currency"),
+    session: AsyncSession = Depends(get_read_session),
     current_user = Depends(current_active_user),
+    cache_headers: dict = Depends(dashboard_etag),
 ):
     """
-    Returns totals for the current month:
+    Returns totals for the current month up to today, in `currency`:
     { total_income: float, total_expense: float, balance: float }
     """
     today = date.today()
     first_day = date(today.year, today.month, 1)
+    rate = await rate_cache.rate(session, currency)
 
+    M = months_to_date(current_user.id, first_day, today)
     q = (
         select(
-            Transaction.type,
-            func.coalesce(func.sum(Transaction.amount), 0).label("total")
-        )
-        .where(
-            Transaction.user_id == current_user.id,
-            Transaction.date >= first_day,
-            Transaction.date <= today
+            M.c.type,
+            func.coalesce(func.sum(converted(M.c.total, rate)), 0).label("total")
         )
-        .group_by(Transaction.type)
+        .join(ExchangeRate, ExchangeRate.currency == M.c.currency)
+        .group_by(M.c.type)
     )
 
     result = await session.execute(q)
@@ -50,18 +73,16 @@ async def summary(
     for ttype, total in rows:
         totals[ttype] = float(total)
 
-    total_income = totals.get("INCOME", 0.0)
-    total_expense = totals.get("EXPENSE", 0.0)
-    balance = total_income - total_expense
-
-    return {"total_income": total_income, "total_expense": total_expense, "balance": balance}
+    return _summary_payload(totals)
 
 
 @router.get("/recent")
+@response_cache.cached("dashboard")
 async def recent_transactions(
     limit: int = Query(5, ge=1, le=50),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user = Depends(current_active_user),
+    cache_headers: dict = Depends(dashboard_etag),
 ):
     """
     Recent transactions for the user (ordered by date desc, then id desc).
@@ -79,26 +100,33 @@ async def recent_transactions(
 
 
 @router.get("/category-expense")
+@response_cache.cached("dashboard")
 async def category_expense(
-    session: AsyncSession = Depends(get_session),
+    currency: Optional[str] = Query(None, pattern=CURRENCY_PATTERN, description="Defaults to the base currency"),
+    session: AsyncSession = Depends(get_read_session),
     current_user = Depends(current_active_user),
+    cache_headers: dict = Depends(dashboard_etag),
 ):
     """
-    Expense totals per category for the current month.
+    Expense totals per category for the current month up to today, in `currency`.
     Returns an object: { "Food": 230.0, "Rent": 900.0, ... }
     """
     today = date.today()
     first_day = date(today.year, today.month, 1)
+    rate = await rate_cache.rate(session, currency)
 
+    M = months_to_date(current_user.id, first_day, today)
     q = (
-        select(Transaction.category, func.coalesce(func.sum(Transaction.amount), 0))
-        .where(
-            Transaction.user_id == current_user.id,
-            Transaction.type == "EXPENSE",
-            Transaction.date >= first_day,
-            Transaction.date <= today,
+        select(
+            Category.name,
+            func.sum(converted(M.c.total, rate)),
         )
-        .group_by(Transaction.category)
+        .select_from(M)
+        .join(ExchangeRate, ExchangeRate.currency == M.c.currency)
+        .join(Category, Category.id == M.c.category_id)
+        .where(M.c.type == "EXPENSE")
+        .group_by(Category.id, Category.name)
+        .having(func.sum(M.c.tx_count) > 0)
     )
 
     result = await session.execute(q)
@@ -107,13 +135,17 @@ async def category_expense(
 
 
 @router.get("/monthly-trend")
+@response_cache.cached("dashboard")
 async def monthly_trend(
     months: int = Query(6, ge=1, le=36),
-    session: AsyncSession = Depends(get_session),
+    currency: Optional[str] = Query(None, pattern=CURRENCY_PATTERN, description="Defaults to the base currency"),
+    session: AsyncSession = Depends(get_read_session),
     current_user = Depends(current_active_user),
+    cache_headers: dict = Depends(dashboard_etag),
 ):
     """
-    Returns income and expense totals per month for the last `months` months (including current).
+    Returns income and expense totals per month for the last `months` months (including current),
+    in `currency`.
     Response shape:
     {
       "labels": ["2025-06","2025-07",...],
@@ -122,35 +154,280 @@ async def monthly_trend(
     }
     """
     today = date.today()
+    months_list = _month_window(today, months)
+    start = months_list[0]
+    rate = await rate_cache.rate(session, currency)
+
+    # Read pre-aggregated months from the rollup table
+    M = months_to_date(current_user.id, start, today)
+    q = (
+        select(
+            M.c.month,
+            M.c.type,
+            func.coalesce(func.sum(converted(M.c.total, rate)), 0).label("total"),
+        )
+        .join(ExchangeRate, ExchangeRate.currency == M.c.currency)
+        .group_by(M.c.month, M.c.type)
+        .order_by(M.c.month)
+    )
+
+    result = await session.execute(q)
+    rows = result.all()  # list of (month_date, type, total)
+
+    return _trend_payload(months_list, rows)
+
+
+@router.get("/overview")
+@response_cache.cached("dashboard")
+async def overview(
+    months: int = Query(6, ge=1, le=36),
+    recent_limit: int = Query(5, ge=1, le=50),
+    currency: Optional[str] = Query(None, pattern=CURRENCY_PATTERN, description="Defaults to the base currency"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user = Depends(current_active_user),
+    cache_headers: dict = Depends(dashboard_etag),
+):
+    """
+    Everything the dashboard page needs in one request:
+    { summary, recent, category_expense, monthly_trend }, each shaped like
+    the matching standalone endpoint (amounts in `currency`).
+
+    The three aggregates come from a single GROUPING SETS pass over the rollup
+    rows (months_to_date); recent transactions are a second query on the same session.
+    """
+    today = date.today()
+    first_day = date(today.year, today.month, 1)
+    months_list = _month_window(today, months)
+    rate = await rate_cache.rate(session, currency)
+
+    R = months_to_date(current_user.id, months_list[0], today).c
+    # only current-month expenses need a per-category breakdown
+    expense_category = case(
+        (and_(R.month == first_day, R.type == "EXPENSE"), R.category_id)
+    ).label("category_id")
+    q = (
+        select(
+            R.month,
+            R.type,
+            # one name per category group; meaningless (and unused) in the per-type rows
+            func.min(Category.name).label("category"),
+            func.grouping(expense_category).label("by_type"),
+            func.coalesce(func.sum(converted(R.total, rate)), 0).label("total"),
+            func.sum(R.tx_count).label("tx_count"),
+        )
+        .join(ExchangeRate, ExchangeRate.currency == R.currency)
+        .join(Category, Category.id == R.category_id)
+        .group_by(
+            func.grouping_sets(
+                tuple_(R.month, R.type),
+                tuple_(R.month, R.type, expense_category),
+            )
+        )
+    )
+    result = await session.execute(q)
+
+    trend_rows = []
+    totals = {"INCOME": 0.0, "EXPENSE": 0.0}
+    category_totals = {}
+    for month, ttype, category, by_type, total, tx_count in result.all():
+        if by_type:
+            trend_rows.append((month, ttype, total))
+            if month == first_day:
+                totals[ttype] = float(total)
+        elif ttype == "EXPENSE" and month == first_day and tx_count:
+            category_totals[category] = float(total or 0)
+
+    recent_q = (
+        select(Transaction)
+        .where(Transaction.user_id == current_user.id)
+        .order_by(desc(Transaction.date), desc(Transaction.id))
+        .limit(recent_limit)
+    )
+    recent = (await session.execute(recent_q)).scalars().all()
+
+    return {
+        "summary": _summary_payload(totals),
+        "recent": [TransactionRead.model_validate(tx) for tx in recent],
+        "category_expense": category_totals,
+        "monthly_trend": _trend_payload(months_list, trend_rows),
+    }
+
+
+# one bucket step per granularity; the key is also the date_trunc unit in SQL
+TIMESERIES_STEPS = {
+    "day": relativedelta(days=1),
+    "week": relativedelta(weeks=1),
+    "month": relativedelta(months=1),
+    "quarter": relativedelta(months=3),
+    "year": relativedelta(years=1),
+}
+# the same steps as Postgres interval literals (there is no 'quarter' interval unit)
+TIMESERIES_INTERVALS = {
+    "day": "1 day",
+    "week": "1 week",
+    "month": "1 month",
+    "quarter": "3 months",
+    "year": "1 year",
+}
+TIMESERIES_MAX_BUCKETS = 4000
+
+
+@router.get("/timeseries")
+async def timeseries(
+    granularity: str = Query("month", pattern="^(day|week|month|quarter|year)$"),
+    date_from: Optional[date] = Query(None, description="Defaults to 12 buckets before date_to"),
+    date_to: Optional[date] = Query(None, description="Defaults to today"),
+    group_by: str = Query("type", pattern="^(type|category)$"),
+    type: Optional[str] = Query(None, pattern="^(INCOME|EXPENSE)$"),
+    currency: Optional[str] = Query(None, pattern=CURRENCY_PATTERN, description="Defaults to the base currency"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user = Depends(current_active_user),
+    cache_headers: dict = Depends(dashboard_etag),
+):
+    """
+    Totals per time bucket, split by type or category, with empty buckets as zeros.
+    Response shape:
+    {
+      "granularity": "week",
+      "labels": ["2025-06-02", "2025-06-09", ...],   (first day of each bucket)
+      "series": { "EXPENSE": [120.0, 0.0, ...], "INCOME": [...] }
+    }
+    Amounts are in `currency`. The range is widened to whole buckets. Gap filling happens in SQL
+    (generate_series), one row per series, so long daily ranges stay a single query.
+    """
+    last = _bucket_start(date_to or date.today(), granularity)
+    step = TIMESERIES_STEPS[granularity]
+    first = _bucket_start(date_from, granularity) if date_from else last - 11 * step
+    if first > last:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from is after date_to")
+    if _bucket_count(first, last, granularity) > TIMESERIES_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range too long: at most {TIMESERIES_MAX_BUCKETS} {granularity} buckets",
+        )
+    rate = await rate_cache.rate(session, currency)
+
+    # months and longer are sums of monthly rollups; days and weeks need raw rows
+    if granularity in ("day", "week"):
+        T = Transaction
+        source_date, amount, conditions = T.date, T.amount, [
+            T.user_id == current_user.id, T.date >= first, T.date < last + step,
+        ]
+        source_type, source_category_id, source_currency = T.type, T.category_id, T.currency
+    else:
+        R = TransactionMonthlyRollup
+        source_date, amount, conditions = R.month, R.total, [
+            R.user_id == current_user.id, R.month >= first, R.month < last + step, R.tx_count > 0,
+        ]
+        source_type, source_category_id, source_currency = R.type, R.category_id, R.currency
+    if type:
+        conditions.append(source_type == type)
+
+    # granularity is validated by the Query pattern; inlined so the GROUP BY
+    # expression is identical to the selected one (bind params never are)
+    unit = literal_column(f"'{granularity}'")
+    key = (source_type if group_by == "type" else Category.name).label("key")
+    bucket = cast(func.date_trunc(unit, source_date), Date).label("bucket")
+    totals = (
+        select(bucket, key, func.sum(converted(amount, rate)).label("total"))
+        .join(ExchangeRate, ExchangeRate.currency == source_currency)
+        .where(*conditions)
+        .group_by(bucket, key)
+    )
+    if group_by == "category":
+        # names are unique per user, so grouping by name is grouping by category
+        totals = totals.join(Category, Category.id == source_category_id)
+    totals = totals.cte("totals")
+    keys = select(totals.c.key).distinct().cte("keys")
+    interval = literal_column(f"interval '{TIMESERIES_INTERVALS[granularity]}'")
+    buckets = select(
+        cast(func.generate_series(first, last, interval), Date).label("bucket")
+    ).cte("buckets")
+
+    # buckets x keys, left-joined to the totals; a user without data still gets labels
+    value = cast(func.coalesce(totals.c.total, 0), Float)
+    q = (
+        select(
+            keys.c.key,
+            func.array_agg(aggregate_order_by(buckets.c.bucket, buckets.c.bucket)),
+            func.array_agg(aggregate_order_by(value, buckets.c.bucket)),
+        )
+        .select_from(
+            buckets
+            .outerjoin(keys, true())
+            .outerjoin(totals, and_(totals.c.bucket == buckets.c.bucket, totals.c.key == keys.c.key))
+        )
+        .group_by(keys.c.key)
+        .order_by(keys.c.key)
+    )
+    rows = (await session.execute(q)).all()
+
+    labels = rows[0][1] if rows else []
+    series = {series_key: values for series_key, _, values in rows if series_key is not None}
+    body = {"granularity": granularity, "labels": labels, "series": series}
+    return FastJSONResponse(body, headers=cache_headers)
+
+
+@router.get("/cache-stats")
+async def cache_stats(
+    current_user = Depends(fastapi_users.current_user(active=True, superuser=True)),
+):
+    """
+    Hit/miss counters of the dashboard / budget response cache (superusers only).
+    """
+    return response_cache.stats()
+
+
+def _month_window(today: date, months: int) -> list:
+    """
+    First day of each of the last `months` months (including current), ascending.
+    """
     start = (today.replace(day=1) - relativedelta(months=months-1))
-    # Build month list in ascending order
     months_list = []
     cur = start
     for _ in range(months):
         months_list.append(cur)
         cur = (cur + relativedelta(months=1))
+    return months_list
 
-    # Use date range and group by year-month via date_trunc
-    # Note: date_trunc('month', transaction.date) returns a timestamp; group by that
-    month_trunc = func.date_trunc("month", Transaction.date).label("month")
-    q = (
-        select(
-            month_trunc,
-            Transaction.type,
-            func.coalesce(func.sum(Transaction.amount), 0).label("total"),
-        )
-        .where(
-            Transaction.user_id == current_user.id,
-            Transaction.date >= start,
-            Transaction.date <= today,
-        )
-        .group_by(month_trunc, Transaction.type)
-        .order_by(month_trunc)
-    )
 
-    result = await session.execute(q)
-    rows = result.all()  # list of (month_datetime, type, total)
+def _bucket_start(d: date, granularity: str) -> date:
+    """
+    First day of the bucket containing `d` (weeks start on Monday, like date_trunc).
+    """
+    if granularity == "day":
+        return d
+    if granularity == "week":
+        return d - relativedelta(days=d.weekday())
+    if granularity == "month":
+        return d.replace(day=1)
+    if granularity == "quarter":
+        return date(d.year, 3 * ((d.month - 1) // 3) + 1, 1)
+    return date(d.year, 1, 1)
 
+
+def _bucket_count(first: date, last: date, granularity: str) -> int:
+    if granularity == "day":
+        return (last - first).days + 1
+    if granularity == "week":
+        return (last - first).days // 7 + 1
+    months = (last.year - first.year) * 12 + last.month - first.month
+    return months // {"month": 1, "quarter": 3, "year": 12}[granularity] + 1
+
+
+def _summary_payload(totals: dict) -> dict:
+    total_income = totals.get("INCOME", 0.0)
+    total_expense = totals.get("EXPENSE", 0.0)
+    balance = total_income - total_expense
+
+    return {"total_income": total_income, "total_expense": total_expense, "balance": balance}
+
+
+def _trend_payload(months_list: list, rows) -> dict:
+    """
+    Build { labels, income, expense } from (month, type, total) rows,
+    filling months without data with zeros.
+    """
     # Build mapping month -> {INCOME: x, EXPENSE: y}
     from collections import OrderedDict
     data_map: "OrderedDict[str, dict]" = OrderedDict()
@@ -169,4 +446,4 @@ async def monthly_trend(
     income = [data_map[k]["INCOME"] for k in labels]
     expense = [data_map[k]["EXPENSE"] for k in labels]
 
-    return {"labels": labels, "income": income, "expense": expense}
\ No newline at end of file
+    return {"labels": labels, "income": income, "expense": expense}
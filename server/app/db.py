@@ -1,4 +1,6 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 from app.config import settings
@@ -6,11 +8,56 @@ from app.config import settings
 class Base(DeclarativeBase):
     pass
 
-engine = create_async_engine(
-    settings.POSTGRES_URL,
-    echo=False,
+# Engines are not created at import: each worker process calls init_engines()
+# from the app lifespan (after the fork), the CLI entry points call it
+# themselves. Until then the session makers below are unbound.
+engine: Optional[AsyncEngine] = None
+replica_engine: Optional[AsyncEngine] = None
+
+async_session_maker = sessionmaker(class_=AsyncSession, expire_on_commit=False)
+
+# optional read replica (settings.REPLICA_URL); see app/replica.py for routing
+replica_session_maker = (
+    sessionmaker(class_=AsyncSession, expire_on_commit=False)
+    if settings.REPLICA_URL
+    else None
 )
 
-async_session_maker = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
\ No newline at end of file
+
+def make_engine(url: str, **connect_args) -> AsyncEngine:
+    """
+    AsyncEngine with the pool limits and statement_timeout from settings.
+    """
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    return create_async_engine(
+        url,
+        echo=False,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        connect_args=connect_args,
+    )
+
+
+def init_engines() -> AsyncEngine:
+    """
+    Create this process's engines (once) and bind the session makers to them.
+    """
+    global engine, replica_engine
+    if engine is None:
+        engine = make_engine(settings.POSTGRES_URL)
+        async_session_maker.configure(bind=engine)
+        if replica_session_maker is not None:
+            replica_engine = make_engine(settings.REPLICA_URL, timeout=settings.REPLICA_CONNECT_TIMEOUT)
+            replica_session_maker.configure(bind=replica_engine)
+    return engine
+
+
+async def dispose_engines() -> None:
+    global engine, replica_engine
+    for current in (engine, replica_engine):
+        if current is not None:
+            await current.dispose()
+    engine = replica_engine = None
@@ -1,16 +1,44 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from app.users.router import router as users_router
 from app.transactions.router import router as transactions_router
 from app.budgets.router import router as budgets_router
 from app.dashboard.router import router as dashboard_router
-from app.db import Base, engine
+from app.currencies.router import router as currencies_router
+from app.categories.router import router as categories_router
+from app.budgets.alerts import alert_queue
+from app.transactions.partitions import partition_maintenance
+from app import db
+from app.metrics import MetricsMiddleware, instrument_engine, mark_worker_stopped, metrics_endpoint
+from app import profiler
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from app.config import settings
 
 origins = [
     "*"
 ]
 
-app = FastAPI(title="Finance Tracker API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # runs in every worker after the fork: engines and pools are per process.
+    # Schema changes are a separate step (python -m app.migrate).
+    engine = db.init_engines()
+    instrument_engine(engine)
+    profiler.instrument_engine(engine)
+    if db.replica_engine is not None:
+        instrument_engine(db.replica_engine, name="replica")
+        profiler.instrument_engine(db.replica_engine)
+    alert_queue.start()
+    partition_maintenance.start()
+    yield
+    await partition_maintenance.stop()
+    await alert_queue.stop()
+    await db.dispose_engines()
+    mark_worker_stopped()
+
+app = FastAPI(title="Finance Tracker API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,13 +47,16 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.GZIP_MIN_SIZE:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_SIZE)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(profiler.QueryProfilerMiddleware)
 
-@app.on_event("startup")
-async def startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
 app.include_router(users_router)
 app.include_router(transactions_router)
 app.include_router(budgets_router)
-app.include_router(dashboard_router)
\ No newline at end of file
+app.include_router(dashboard_router)
+app.include_router(currencies_router)
+app.include_router(categories_router)
\ No newline at end of file
@@ -0,0 +1,183 @@
+# app/metrics.py
+"""
+Prometheus metrics: per-route HTTP latency/status, SQLAlchemy statement timing,
+pool checkout wait, pool occupancy and connection errors. Scraped at /metrics.
+
+With several workers, set PROMETHEUS_MULTIPROC_DIR (an empty directory, in the
+environment of the server process): every worker then writes its samples there
+and /metrics reports the sum over all of them. Gauges are "livesum" for that
+reason, and nothing is computed at scrape time, since a scrape only runs in
+one worker.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from starlette.responses import Response
+
+from app.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ["method"],
+    multiprocess_mode="livesum",
+)
+
+DB_STATEMENT_LATENCY = Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time", ["operation"],
+    buckets=DB_BUCKETS,
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+    buckets=DB_BUCKETS,
+)
+DB_ERRORS = Counter(
+    "db_errors_total", "Errors raised by the database driver", ["kind"]
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured pool size", ["engine"], multiprocess_mode="livesum")
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_IN = Gauge(
+    "db_pool_checked_in", "Idle connections in the pool", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections opened beyond pool_size", ["engine"], multiprocess_mode="livesum"
+)
+
+
+def route_label(scope) -> str:
+    """
+    Route template ("/transactions/{transaction_id}") so label cardinality stays bounded.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (does not buffer streaming responses).
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.labels(method).inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.labels(method).dec()
+            route = route_label(scope)
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+
+
+def _record_pool(name: str, pool, returning: bool = False) -> None:
+    """
+    Publish the pool's occupancy. The checkin event fires before the connection
+    is back in the pool (`returning`): it then goes to the idle queue, or is
+    closed as overflow when the queue is full.
+    """
+    checked_out, checked_in, overflow = pool.checkedout(), pool.checkedin(), pool.overflow()
+    if returning:
+        checked_out -= 1
+        if checked_in < pool.size():
+            checked_in += 1
+        else:
+            overflow -= 1
+    DB_POOL_SIZE.labels(name).set(pool.size())
+    DB_POOL_CHECKED_OUT.labels(name).set(checked_out)
+    DB_POOL_CHECKED_IN.labels(name).set(checked_in)
+    DB_POOL_OVERFLOW.labels(name).set(overflow)
+
+
+def instrument_engine(engine, name: str = "primary") -> None:
+    """
+    Attach timing / error hooks to an AsyncEngine and register its pool gauges.
+    """
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_STATEMENT_LATENCY.labels(operation).observe(time.perf_counter() - started)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(context):
+        stack = context.connection.info.get("query_start") if context.connection is not None else None
+        if stack:
+            stack.pop()
+        DB_ERRORS.labels("disconnect" if context.is_disconnect else "error").inc()
+
+    @event.listens_for(pool, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        _record_pool(name, pool, returning=True)
+
+    # time how long callers wait for a connection (free slot or new connect)
+    connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
+            _record_pool(name, pool)
+
+    pool.connect = timed_connect
+
+    _record_pool(name, pool)
+
+
+def mark_worker_stopped() -> None:
+    """
+    Drop this worker's live gauges from the multiprocess samples (on shutdown).
+    """
+    if settings.PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+async def metrics_endpoint(request):
+    if settings.PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,64 @@
+# app/migrate.py
+"""
+One-shot schema step, run once per deploy before the API workers start:
+
+    python -m app.migrate
+
+Creates missing tables, maintains the transaction partitions and loads
+EXCHANGE_RATES_FILE. Workers don't touch the schema on startup, so they come
+up fast and don't race each other doing it.
+"""
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from app import db
+from app.config import settings
+from app.currencies.rates import init_rates
+from app.transactions import partitions
+
+# every model module, so create_all sees all tables
+import app.budgets.models  # noqa: F401
+import app.categories.models  # noqa: F401
+import app.currencies.models  # noqa: F401
+import app.transactions.models  # noqa: F401
+import app.users.models  # noqa: F401
+import app.watermarks  # noqa: F401
+
+logger = logging.getLogger("app.migrate")
+
+
+async def check_connection_budget(conn) -> None:
+    """
+    Warn when the workers' pools together could exceed max_connections.
+    """
+    max_connections = int((await conn.execute(text("SHOW max_connections"))).scalar())
+    per_worker = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    total = settings.WEB_CONCURRENCY * per_worker
+    if total > max_connections:
+        logger.warning(
+            "%d workers x %d connections = %d exceeds max_connections=%d; lower DB_POOL_SIZE / "
+            "DB_MAX_OVERFLOW or WEB_CONCURRENCY",
+            settings.WEB_CONCURRENCY, per_worker, total, max_connections,
+        )
+
+
+async def migrate() -> None:
+    engine = db.init_engines()
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(db.Base.metadata.create_all)
+            await partitions.maintain(conn)
+            await check_connection_budget(conn)
+        async with db.async_session_maker() as session:
+            await init_rates(session)
+            await session.commit()
+    finally:
+        await db.dispose_engines()
+    logger.info("schema up to date")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(migrate())
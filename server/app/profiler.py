@@ -0,0 +1,149 @@
+# app/profiler.py
+"""
+Per-request query profiling and slow-query logging.
+
+When profiling is on for a request (settings.QUERY_PROFILING, or the
+`X-Query-Profile` header carrying settings.QUERY_PROFILE_KEY), every statement
+run on the engine during that request is counted and timed. The summary is
+returned in `X-Query-Profile` / `Server-Timing` response headers and logged as
+one structured line, including statements that ran more than once (N+1s,
+redundant refreshes).
+
+Independently, any statement slower than settings.SLOW_QUERY_MS is logged with
+its SQL and the shapes (types) of its bound parameters, never their values.
+"""
+import contextvars
+import json
+import logging
+import time
+from collections import Counter
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger("app.profiler")
+
+_current_profile: contextvars.ContextVar = contextvars.ContextVar("query_profile", default=None)
+
+
+class QueryProfile:
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.counts: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.statements += 1
+        self.db_time += duration
+        self.counts[statement] += 1
+
+    def repeated(self) -> dict:
+        """
+        Statements (by SQL text) executed more than once in the request.
+        """
+        return {sql: n for sql, n in self.counts.items() if n > 1}
+
+    def header_value(self) -> str:
+        repeated = self.repeated()
+        return (
+            f"statements={self.statements}; db_ms={self.db_time * 1000:.1f}; "
+            f"distinct={len(self.counts)}; repeated={sum(repeated.values()) - len(repeated)}"
+        )
+
+
+def parameter_shapes(parameters):
+    """
+    Describe bound parameters by type only, so logs never contain user data.
+    """
+    if isinstance(parameters, dict):
+        return {k: type(v).__name__ for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: shape of the first row and the row count
+            return {"rows": len(parameters), "row": parameter_shapes(parameters[0])}
+        return [type(v).__name__ for v in parameters]
+    return type(parameters).__name__
+
+
+def instrument_engine(engine) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["profile_start"].pop()
+
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.record(statement, duration)
+
+        if settings.SLOW_QUERY_MS and duration * 1000 >= settings.SLOW_QUERY_MS:
+            logger.warning(json.dumps({
+                "event": "slow_query",
+                "duration_ms": round(duration * 1000, 1),
+                "sql": statement,
+                "params": parameter_shapes(parameters),
+            }))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(context):
+        if context.connection is not None:
+            stack = context.connection.info.get("profile_start")
+            if stack:
+                stack.pop()
+
+
+class QueryProfilerMiddleware:
+    """
+    Pure ASGI middleware that enables a QueryProfile for opted-in requests.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _enabled(scope) -> bool:
+        if settings.QUERY_PROFILING:
+            return True
+        if not settings.QUERY_PROFILE_KEY:
+            return False
+        for name, value in scope.get("headers", []):
+            if name == b"x-query-profile":
+                return value.decode("latin-1") == settings.QUERY_PROFILE_KEY
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._enabled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = _current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-profile", profile.header_value().encode()))
+                headers.append((b"server-timing", f"db;dur={profile.db_time * 1000:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+            repeated = profile.repeated()
+            log = logger.warning if any(
+                n >= settings.QUERY_REPEAT_WARN for n in repeated.values()
+            ) else logger.info
+            log(json.dumps({
+                "event": "query_profile",
+                "method": scope["method"],
+                "path": scope["path"],
+                "statements": profile.statements,
+                "db_ms": round(profile.db_time * 1000, 1),
+                "repeated": [{"sql": sql, "count": n} for sql, n in repeated.items()],
+            }))
@@ -0,0 +1,127 @@
+# app/replica.py
+"""
+Read-replica routing for GET endpoints.
+
+With settings.REPLICA_URL set, read sessions come from the replica, except:
+
+- read-your-writes: for READ_YOUR_WRITES_SECONDS after a user's write, that
+  user's reads stay on the primary, so a lagging replica never hides their own
+  change. Writes are recognised by the changed_at of the user's change
+  watermarks (bumped by `app.watermarks.touch` in the write's transaction), read
+  from the primary, so every worker sees them. That costs one indexed lookup on
+  the primary per read session; the session it ran on then serves the read if
+  it stays on the primary.
+- fallback: if the replica can't be reached, the read goes to the primary and
+  the replica is skipped for REPLICA_RETRY_SECONDS.
+
+Without REPLICA_URL every read uses the primary. Pointing REPLICA_URL at the
+primary is a valid local setup for exercising the routing.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+from prometheus_client import Counter
+from sqlalchemy import func, literal, select
+from sqlalchemy.exc import DBAPIError
+
+from app.config import settings
+from app.db import async_session_maker, replica_session_maker
+from app.watermarks import ChangeWatermark
+
+logger = logging.getLogger("app.replica")
+
+READ_SESSIONS = Counter(
+    "db_read_sessions_total", "Read sessions by target database and reason", ["target", "reason"]
+)
+
+
+class ReadRouter:
+    def __init__(
+        self,
+        primary_maker,
+        replica_maker=None,
+        sticky_seconds: int = 10,
+        retry_seconds: float = 30,
+        clock=time.monotonic,
+    ):
+        self.primary_maker = primary_maker
+        self.replica_maker = replica_maker
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._replica_down_until = 0.0
+
+    async def _wrote_recently(self, session, user_id) -> bool:
+        """
+        Whether any of the user's watermarks changed in the last sticky_seconds.
+        """
+        result = await session.execute(
+            select(literal(1))
+            .where(
+                ChangeWatermark.user_id == user_id,
+                ChangeWatermark.changed_at > func.now() - timedelta(seconds=self.sticky_seconds),
+            )
+            .limit(1)
+        )
+        return result.first() is not None
+
+    async def _primary_for(self, user_id):
+        """
+        (reason, session) when the read must go to the primary, else (None, None).
+        The session is the one the read-your-writes check already ran on, if any.
+        """
+        if self.replica_maker is None:
+            return "no_replica", None
+        if self._clock() < self._replica_down_until:
+            return "replica_down", None
+        if user_id is not None and self.sticky_seconds:
+            session = self.primary_maker()
+            try:
+                recent = await self._wrote_recently(session, user_id)
+            except BaseException:
+                await session.close()
+                raise
+            if recent:
+                return "recent_write", session
+            await session.close()
+        return None, None
+
+    async def _replica_session(self):
+        session = self.replica_maker()
+        try:
+            # check a connection out now so an unreachable replica is caught here
+            await session.connection()
+        except (OSError, asyncio.TimeoutError, DBAPIError):
+            await session.close()
+            self._replica_down_until = self._clock() + self.retry_seconds
+            logger.warning(
+                "read replica unavailable, using the primary for %ss", self.retry_seconds, exc_info=True
+            )
+            return None
+        return session
+
+    @asynccontextmanager
+    async def session(self, user_id=None):
+        reason, session = await self._primary_for(user_id)
+        if reason is None:
+            session = await self._replica_session()
+            reason = "replica_down" if session is None else "read"
+        if reason == "read":
+            READ_SESSIONS.labels("replica", reason).inc()
+        else:
+            READ_SESSIONS.labels("primary", reason).inc()
+            session = session or self.primary_maker()
+
+        async with session:
+            yield session
+
+
+read_router = ReadRouter(
+    async_session_maker,
+    replica_session_maker,
+    sticky_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    retry_seconds=settings.REPLICA_RETRY_SECONDS,
+)
@@ -0,0 +1,102 @@
+# app/repository.py
+"""
+Single-statement reads and writes for rows owned by a user.
+
+Every operation is one SQL statement that carries both the primary key and
+the owner (`WHERE id = :id AND user_id = :uid`) and hands back the row through
+RETURNING, so there is no SELECT-then-check before a write and no refresh
+after it. A row that doesn't exist or belongs to someone else is a 404.
+
+SQL-expression attributes (column_property, e.g. a category name looked up by
+id) are not part of an entity's RETURNING row. Updates and deletes return them
+as extra columns; an INSERT can't correlate a sub-select in its RETURNING list,
+so create() selects the entity from the INSERT as a CTE instead.
+"""
+from typing import Iterable, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Column, delete, func, insert, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
+
+
+class OwnedRepository:
+    def __init__(self, model, not_found: str):
+        self.model = model
+        self.not_found = not_found
+        self.computed = [
+            prop for prop in inspect(model).column_attrs if not isinstance(prop.expression, Column)
+        ]
+
+    def _owned(self, id, user_id) -> tuple:
+        return self.model.id == id, self.model.user_id == user_id
+
+    def _found(self, obj):
+        if obj is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=self.not_found)
+        return obj
+
+    def _returning(self, stmt, *extra):
+        return stmt.returning(self.model, *(prop.expression for prop in self.computed), *extra)
+
+    def _loaded(self, row):
+        """
+        Entity from a _returning() row, with its computed attributes set;
+        returns (obj, remaining extra columns).
+        """
+        row = self._found(row)
+        obj, n = row[0], len(self.computed)
+        for prop, value in zip(self.computed, row[1:1 + n]):
+            set_committed_value(obj, prop.key, value)
+        return obj, row[1 + n:]
+
+    async def get(self, session: AsyncSession, id, user_id):
+        result = await session.execute(select(self.model).where(*self._owned(id, user_id)))
+        return self._found(result.scalar_one_or_none())
+
+    async def create(self, session: AsyncSession, user_id, values: dict):
+        inserted = (
+            insert(self.model)
+            .values(user_id=user_id, **values)
+            .returning(*self.model.__table__.c)
+            .cte("inserted")
+        )
+        result = await session.execute(select(aliased(self.model, inserted)))
+        return result.scalar_one()
+
+    async def update(self, session: AsyncSession, id, user_id, values: dict):
+        obj, _ = await self.update_with_previous(session, id, user_id, values)
+        return obj
+
+    async def update_with_previous(
+        self, session: AsyncSession, id, user_id, values: dict, previous: Iterable[str] = ()
+    ) -> Tuple[object, dict]:
+        """
+        Like update(), but also returns the pre-update values of the `previous`
+        columns, read from a locked sub-select in the same statement.
+        """
+        model = self.model
+        previous = list(previous)
+        old = (
+            select(model.id, *(getattr(model, name) for name in previous))
+            .where(*self._owned(id, user_id))
+            .with_for_update()
+            .subquery("previous")
+        )
+        stmt = self._returning(
+            update(model).where(model.id == old.c.id).values(**values, updated_at=func.now()),
+            *(old.c[name] for name in previous),
+        ).execution_options(synchronize_session=False, populate_existing=True)
+        obj, old_values = self._loaded((await session.execute(stmt)).one_or_none())
+        return obj, dict(zip(previous, old_values))
+
+    async def delete(self, session: AsyncSession, id, user_id):
+        """
+        Delete the row and return it as it was.
+        """
+        stmt = self._returning(
+            delete(self.model).where(*self._owned(id, user_id))
+        ).execution_options(synchronize_session=False)
+        obj, _ = self._loaded((await session.execute(stmt)).one_or_none())
+        return obj
@@ -0,0 +1,43 @@
+# app/serialization.py
+"""
+Fast JSON path for large row sets.
+
+Endpoints that return many rows can select plain columns and hand the rows to
+`records()` / `columns()` and `FastJSONResponse`, skipping per-row Pydantic
+model construction and FastAPI's jsonable_encoder. The output matches what the
+equivalent response_model would produce (ISO dates, "Z" for UTC datetimes).
+"""
+from decimal import Decimal
+from typing import Iterable, Sequence
+
+import orjson
+from fastapi.responses import Response
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+def records(rows: Iterable[Sequence], fields: Sequence[str]) -> list:
+    """
+    Rows as a list of {field: value} objects.
+    """
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def columns(rows: Sequence[Sequence], fields: Sequence[str]) -> dict:
+    """
+    Rows as parallel arrays, one per field: {field: [v1, v2, ...]}.
+    """
+    if not rows:
+        return {field: [] for field in fields}
+    return {field: list(values) for field, values in zip(fields, zip(*rows))}
@@ -0,0 +1,199 @@
+# app/transactions/batch.py
+"""
+Set-based write helpers for POST /transactions/batch.
+
+Each helper issues one statement (for per-id updates: a locking SELECT and an
+executemany UPDATE per set of changed columns) for its whole list, restricted to the given user, and
+records the rollup deltas of every row it touches. The caller applies the
+deltas and commits once.
+"""
+from typing import Callable, List
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.categories.lookup import replace_names
+from app.transactions import schemas
+from app.transactions.models import Transaction
+from app.transactions.rollups import RollupDeltas
+from app.transactions.sync import record_deletions
+
+ROLLUP_COLUMNS = (
+    Transaction.date, Transaction.type, Transaction.category_id, Transaction.currency, Transaction.amount
+)
+
+
+def _result(op: str, index: int, id, status: str) -> dict:
+    return {"op": op, "index": index, "id": id, "status": status}
+
+
+def _changes(payload) -> dict:
+    data = payload.model_dump(exclude_unset=True, exclude={"id"})
+    if data.get("type"):
+        data["type"] = data["type"].upper()
+    return data
+
+
+async def create_many(
+    session: AsyncSession, user_id, items: List[schemas.TransactionCreate], deltas: RollupDeltas
+) -> List[dict]:
+    if not items:
+        return []
+    rows = [
+        {
+            "user_id": user_id,
+            "type": item.type.upper(),
+            "category": item.category,
+            "amount": item.amount,
+            "currency": item.currency,
+            "date": item.date,
+            "note": item.note,
+        }
+        for item in items
+    ]
+    await replace_names(session, user_id, rows)
+    result = await session.execute(
+        insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True), rows
+    )
+    for row in rows:
+        deltas.add(user_id, row["date"], row["type"], row["category_id"], row["currency"], row["amount"])
+    return [_result("create", i, tx_id, "created") for i, tx_id in enumerate(result.scalars())]
+
+
+async def update_many(
+    session: AsyncSession, user_id, items: List[schemas.TransactionBatchUpdate], deltas: RollupDeltas
+) -> List[dict]:
+    if not items:
+        return []
+    # lock the user's rows and read their current rollup columns in one go
+    result = await session.execute(
+        select(Transaction.id, *ROLLUP_COLUMNS)
+        .where(Transaction.user_id == user_id, Transaction.id.in_({item.id for item in items}))
+        .with_for_update()
+    )
+    current = {row.id: row._asdict() for row in result}
+    stored_dates = {tx_id: row["date"] for tx_id, row in current.items()}
+    changes_by_index = [_changes(item) if item.id in current else None for item in items]
+    await replace_names(session, user_id, [changes for changes in changes_by_index if changes])
+
+    results, params = [], {}
+    for i, item in enumerate(items):
+        old = current.get(item.id)
+        if old is None:
+            results.append(_result("update", i, item.id, "not_found"))
+            continue
+        changes = changes_by_index[i]
+        if changes:
+            new = {**old, **changes}
+            for values, sign in ((old, -1), (new, 1)):
+                deltas.add(
+                    user_id, values["date"], values["type"], values["category_id"],
+                    values["currency"], values["amount"], sign=sign,
+                )
+            current[item.id] = new
+            # repeated ids collapse into one row update
+            params.setdefault(item.id, {}).update(changes)
+        results.append(_result("update", i, item.id, "updated"))
+
+    # one executemany per set of changed columns; ownership was checked above.
+    # Rows are matched on the full (id, date) key of the partitioned table, with
+    # the date read above, so a date change can move a row to another partition.
+    table = Transaction.__table__
+    groups = {}
+    for tx_id, changes in params.items():
+        row = {"b_id": tx_id, "b_date": stored_dates[tx_id]}
+        row.update({f"v_{column}": value for column, value in changes.items()})
+        groups.setdefault(tuple(sorted(changes)), []).append(row)
+    for columns, rows in groups.items():
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"), table.c.date == bindparam("b_date"))
+            .values({column: bindparam(f"v_{column}") for column in columns})
+            .values(updated_at=func.now())
+        )
+        await session.execute(stmt, rows)
+    return results
+
+
+async def delete_many(
+    session: AsyncSession, user_id, ids: List[int], deltas: RollupDeltas
+) -> List[dict]:
+    if not ids:
+        return []
+    result = await session.execute(
+        delete(Transaction)
+        .where(Transaction.user_id == user_id, Transaction.id.in_(set(ids)))
+        .returning(Transaction.id, *ROLLUP_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = set()
+    for row in result:
+        deleted.add(row.id)
+        deltas.add(user_id, row.date, row.type, row.category_id, row.currency, row.amount, sign=-1)
+    await record_deletions(session, user_id, deleted)
+
+    results = []
+    for i, tx_id in enumerate(ids):
+        if tx_id in deleted:
+            results.append(_result("delete", i, tx_id, "deleted"))
+            deleted.discard(tx_id)  # a repeated id is only deleted once
+        else:
+            results.append(_result("delete", i, tx_id, "not_found"))
+    return results
+
+
+async def update_where(
+    session: AsyncSession,
+    user_id,
+    apply_filters: Callable,
+    values: schemas.TransactionUpdate,
+    deltas: RollupDeltas,
+) -> int:
+    """
+    UPDATE every matching row of the user; old values come from a locked sub-select
+    so the rollups can be moved in the same round trip.
+    """
+    changes = _changes(values)
+    if not changes:
+        return 0
+    await replace_names(session, user_id, [changes])
+    old = apply_filters(
+        select(Transaction.id, *ROLLUP_COLUMNS).where(Transaction.user_id == user_id)
+    ).with_for_update().subquery("old")
+
+    result = await session.execute(
+        update(Transaction)
+        .where(Transaction.id == old.c.id)
+        .values(**changes, updated_at=func.now())
+        .returning(
+            old.c.date, old.c.type, old.c.category_id, old.c.currency, old.c.amount,
+            Transaction.date.label("new_date"),
+            Transaction.type.label("new_type"),
+            Transaction.category_id.label("new_category_id"),
+            Transaction.currency.label("new_currency"),
+            Transaction.amount.label("new_amount"),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    count = 0
+    for row in result:
+        count += 1
+        deltas.add(user_id, row.date, row.type, row.category_id, row.currency, row.amount, sign=-1)
+        deltas.add(user_id, row.new_date, row.new_type, row.new_category_id, row.new_currency, row.new_amount)
+    return count
+
+
+async def delete_where(
+    session: AsyncSession, user_id, apply_filters: Callable, deltas: RollupDeltas
+) -> int:
+    result = await session.execute(
+        apply_filters(delete(Transaction).where(Transaction.user_id == user_id))
+        .returning(Transaction.id, *ROLLUP_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = []
+    for row in result:
+        deleted.append(row.id)
+        deltas.add(user_id, row.date, row.type, row.category_id, row.currency, row.amount, sign=-1)
+    await record_deletions(session, user_id, deleted)
+    return len(deleted)
@@ -0,0 +1,58 @@
+# app/transactions/exporter.py
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from app.replica import read_router
+
+# columns written to the export, in order
+EXPORT_COLUMNS = ("id", "type", "category", "amount", "currency", "date", "note", "created_at", "updated_at")
+
+# rows fetched per round trip from the server-side cursor
+YIELD_PER = 1000
+
+
+def _plain(value):
+    """
+    Convert DB values to JSON/CSV friendly scalars.
+    """
+    if value is None or isinstance(value, (str, int)):
+        return value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return float(value)
+
+
+async def _iter_row_batches(query, user_id=None) -> AsyncIterator[list]:
+    """
+    Run `query` (a column select) on a server-side cursor and yield row batches.
+
+    The session is owned by the generator so it stays open for as long as the
+    response is streaming, independent of request dependencies. Reads go
+    through the replica router like other GET handlers.
+    """
+    async with read_router.session(user_id) as session:
+        result = await session.stream(query.execution_options(yield_per=YIELD_PER))
+        async for partition in result.partitions():
+            yield partition
+
+
+async def stream_csv(query, user_id=None) -> AsyncIterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buf.getvalue()
+
+    async for rows in _iter_row_batches(query, user_id):
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows([_plain(v) for v in row] for row in rows)
+        yield buf.getvalue()
+
+
+async def stream_ndjson(query, user_id=None) -> AsyncIterator[str]:
+    async for rows in _iter_row_batches(query, user_id):
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, map(_plain, row)))) + "\n" for row in rows
+        )
@@ -0,0 +1,285 @@
+# app/transactions/importer.py
+import codecs
+import csv
+import json
+from collections import deque
+from decimal import Decimal
+from typing import AsyncIterator, Optional, Tuple
+
+import asyncpg
+from pydantic import ValidationError
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.categories.lookup import category_ids
+from app.currencies.rates import rate_cache
+from app.transactions import schemas
+from app.transactions.rollups import RollupDeltas
+from app.transactions.sync import begin_transaction_write
+
+# columns written by COPY; id, created_at and updated_at come from server defaults
+COPY_COLUMNS = ("user_id", "type", "category_id", "amount", "currency", "date", "note")
+
+# cap on per-row errors kept in memory / returned to the client
+MAX_REPORTED_ERRORS = 1000
+
+# cap on one CSV record (all of its lines), so an unbalanced quote can't buffer the upload
+MAX_RECORD_LENGTH = 64 * 1024
+
+# (line number, parsed row or None, parse error or None)
+ParsedRow = Tuple[int, Optional[dict], Optional[str]]
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split an async byte stream into text lines without buffering the whole body.
+    A leading UTF-8 BOM (common in spreadsheet exports) is dropped.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buf = ""
+    async for chunk in stream:
+        buf += decoder.decode(chunk)
+        *lines, buf = buf.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buf += decoder.decode(b"", final=True)
+    if buf:
+        yield buf.rstrip("\r")
+
+
+class _LineFeed:
+    """
+    Iterator the csv reader pulls its lines from; `iter_csv_rows` pushes a
+    record's lines in before asking the reader for it.
+    """
+    def __init__(self):
+        self.lines = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+def _in_quoted_field(line: str, quoted: bool) -> bool:
+    """
+    Whether a quoted field is still open at the end of `line`, given whether one
+    was open at its start. Follows the csv module's default dialect: a quote
+    opens a field only as its first character ("TV 55" screen" is literal) and
+    "" inside a quoted field is an escaped quote.
+    """
+    if '"' not in line:
+        return quoted
+    at_field_start = not quoted
+    i, n = 0, len(line)
+    while i < n:
+        char = line[i]
+        if quoted:
+            if char == '"':
+                if line.startswith('"', i + 1):
+                    i += 1
+                else:
+                    quoted = False
+        elif char == ",":
+            at_field_start = True
+            i += 1
+            continue
+        elif char == '"' and at_field_start:
+            quoted = True
+        at_field_start = False
+        i += 1
+    return quoted
+
+
+async def iter_csv_rows(stream: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """
+    Parse CSV with a header row. Quoted fields may span several lines: lines are
+    collected until no quoted field is left open, then handed to one csv reader.
+    A record longer than MAX_RECORD_LENGTH characters is reported and skipped.
+    """
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    header = None
+    quoted = False
+    too_long = False
+    length = 0
+    start = 0
+    lineno = 0
+    async for line in iter_lines(stream):
+        lineno += 1
+        if not feed.lines and not too_long:
+            start = lineno
+            length = 0
+        length += len(line) + 1
+        quoted = _in_quoted_field(line, quoted)
+        if length > MAX_RECORD_LENGTH:
+            feed.lines.clear()
+            too_long = True
+        else:
+            feed.lines.append(line + "\n")
+        if quoted:
+            continue
+
+        if too_long:
+            too_long = False
+            yield start, None, f"record longer than {MAX_RECORD_LENGTH} characters"
+            continue
+        if len(feed.lines) == 1 and not line.strip():
+            feed.lines.clear()
+            continue
+
+        try:
+            values = next(reader)
+        except csv.Error as e:
+            feed.lines.clear()
+            yield start, None, f"invalid CSV: {e}"
+            continue
+
+        if header is None:
+            header = [h.strip().lower() for h in values]
+            continue
+
+        if len(values) != len(header):
+            yield start, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+
+        row = {k: (v if v != "" else None) for k, v in zip(header, values)}
+        yield start, row, None
+
+    if quoted:
+        yield start, None, "unterminated quoted field"
+
+
+async def iter_ndjson_rows(stream: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """
+    Parse newline-delimited JSON, one object per line.
+    """
+    lineno = 0
+    async for line in iter_lines(stream):
+        lineno += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield lineno, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield lineno, None, "expected a JSON object"
+            continue
+        yield lineno, row, None
+
+
+async def copy_records(session: AsyncSession, records: list) -> None:
+    """
+    Load validated records through asyncpg's binary COPY on the session's connection.
+    """
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        "transactions", records=records, columns=COPY_COLUMNS
+    )
+
+
+async def import_rows(
+    session: AsyncSession,
+    user_id,
+    rows: AsyncIterator[ParsedRow],
+    atomic: bool = False,
+    batch_size: int = 1000,
+    expense_categories: Optional[set] = None,
+) -> dict:
+    """
+    Validate parsed rows against TransactionCreate and COPY them in batches,
+    updating the monthly rollups in the same savepoint.
+
+    Each batch runs inside a SAVEPOINT. In non-atomic mode invalid rows and failed
+    batches are reported and skipped; in atomic mode any error rolls everything back.
+    Only one batch of records is held in memory at a time.
+
+    Category ids of stored EXPENSE rows are added to `expense_categories`, if given.
+    """
+    report = {"inserted": 0, "failed": 0, "committed": False, "errors": []}
+    batch = []
+    lines = []
+
+    await begin_transaction_write(session, user_id)
+    # one fresh copy of the rates table to check every row's currency against
+    await rate_cache.refresh(session)
+    known_currencies = rate_cache.rates
+
+    def add_error(line: int, error: str):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line, "error": error})
+
+    async def flush():
+        if not batch:
+            return
+        if atomic and report["failed"]:
+            # nothing will be committed; keep validating for the report only
+            batch.clear()
+            lines.clear()
+            return
+        try:
+            async with session.begin_nested():
+                # names -> ids, one statement per batch; new categories roll back with it
+                ids = await category_ids(session, user_id, {r[2] for r in batch})
+                records = [(u, t, ids[category], *rest) for u, t, category, *rest in batch]
+                deltas = RollupDeltas()
+                for _, tx_type, category_id, amount, currency, tx_date, _ in records:
+                    deltas.add(user_id, tx_date, tx_type, category_id, currency, amount)
+                await copy_records(session, records)
+                await deltas.apply(session)
+            report["inserted"] += len(batch)
+            if expense_categories is not None:
+                expense_categories.update(r[2] for r in records if r[1] == "EXPENSE")
+        except (asyncpg.PostgresError, asyncpg.InterfaceError, DBAPIError) as e:
+            for line in lines:
+                add_error(line, f"batch rejected by database: {e}")
+        batch.clear()
+        lines.clear()
+
+    async for line, row, error in rows:
+        if error is not None:
+            add_error(line, error)
+            continue
+        if row.get("currency") is None:
+            row.pop("currency", None)  # empty cell: base currency
+        try:
+            payload = schemas.TransactionCreate.model_validate(row)
+        except ValidationError as e:
+            add_error(line, "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            ))
+            continue
+        if payload.currency not in known_currencies:
+            add_error(line, f"currency: unknown currency {payload.currency}")
+            continue
+
+        batch.append((
+            user_id,
+            payload.type.upper(),
+            payload.category,
+            Decimal(str(payload.amount)),
+            payload.currency,
+            payload.date,
+            payload.note,
+        ))
+        lines.append(line)
+        if len(batch) >= batch_size:
+            await flush()
+
+    await flush()
+
+    if atomic and report["failed"]:
+        await session.rollback()
+        report["inserted"] = 0
+        return report
+
+    await session.commit()
+    report["committed"] = True
+    return report
@@ -1,14 +1,32 @@
 # app/transactions/models.py
-from sqlalchemy import Date, Numeric, String, Text, DateTime, func, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import (
+    BigInteger, Date, Numeric, String, Text, DateTime, Integer, Computed, Sequence, func, ForeignKey, Index
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, TSVECTOR
+from sqlalchemy.orm import Mapped, column_property, mapped_column
 import uuid
 from typing import Optional
 
+from app.categories.models import category_name
+from app.config import settings
 from app.db import Base
 
+# shared by transactions.change_seq and tombstones: one ordered change stream per database
+change_seq = Sequence("transaction_change_seq")
+
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # backs ORDER BY date DESC, id DESC and keyset pagination per user
+        Index("ix_transactions_user_date_id", "user_id", "date", "id"),
+        Index("ix_transactions_search_vector", "search_vector", postgresql_using="gin"),
+        # delta sync: rows changed after a given sequence number
+        Index("ix_transactions_user_change_seq", "user_id", "change_seq"),
+        # category filters and budget spending by (user, category id)
+        Index("ix_transactions_user_category_date", "user_id", "category_id", "date"),
+        # range-partitioned by date; partitions are managed in app/transactions/partitions.py
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
@@ -21,11 +39,35 @@ class Transaction(Base):
     )
 
     type: Mapped[str] = mapped_column(String(10), nullable=False)  # 'INCOME' | 'EXPENSE'
-    category: Mapped[str] = mapped_column(String(100), nullable=False)
+    category_id: Mapped[int] = mapped_column(ForeignKey("categories.id"), nullable=False)
+    # the name, for reads; writes set category_id (see app/categories/lookup.py)
+    category: Mapped[str] = column_property(category_name(category_id))
     amount: Mapped[Numeric] = mapped_column(Numeric(12, 2), nullable=False)
-    date: Mapped[Date] = mapped_column(Date, nullable=False)
+    # ISO 4217 code the amount is in; converted in SQL via exchange_rates
+    currency: Mapped[str] = mapped_column(
+        String(3), nullable=False, default=settings.BASE_CURRENCY, server_default=settings.BASE_CURRENCY
+    )
+    # part of the table's primary key because it is the partition key
+    date: Mapped[Date] = mapped_column(Date, primary_key=True)
     note: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
+    # full-text index over the note (category names are matched through categories);
+    # deferred so list queries don't load it
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', coalesce(note, ''))", persisted=True),
+        deferred=True,
+    )
+
+    # position in the change stream; drawn again on every UPDATE (see /transactions/changes)
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger,
+        change_seq,
+        server_default=change_seq.next_value(),
+        onupdate=change_seq.next_value(),
+        nullable=False,
+    )
+
     created_at: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -38,5 +80,59 @@ class Transaction(Base):
         nullable=False
     )
 
+    # rows are still identified by id alone (ids come from one sequence)
+    __mapper_args__ = {"primary_key": [id]}
+
+    def __repr__(self) -> str:
+        return f"<Transaction id={self.id} user_id={self.user_id} type={self.type} amount={self.amount}>"
+
+class TransactionMonthlyRollup(Base):
+    """
+    Pre-aggregated totals per (user, month, type, category, currency).
+    Maintained by the transaction write paths; see app/transactions/rollups.py.
+    """
+    __tablename__ = "transaction_monthly_rollups"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("user.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    month: Mapped[Date] = mapped_column(Date, primary_key=True)  # first day of the month
+    type: Mapped[str] = mapped_column(String(10), primary_key=True)
+    category_id: Mapped[int] = mapped_column(ForeignKey("categories.id"), primary_key=True)
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)  # totals are per currency
+
+    total: Mapped[Numeric] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    tx_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<TransactionMonthlyRollup user_id={self.user_id} month={self.month} {self.type}/{self.category_id} total={self.total} {self.currency}>"
+
+class TransactionTombstone(Base):
+    """
+    Ids of deleted transactions, so offline clients can catch up on deletions.
+    Written by every transaction delete path.
+    """
+    __tablename__ = "transaction_tombstones"
+    __table_args__ = (
+        Index("ix_transaction_tombstones_user_seq", "user_id", "seq"),
+    )
+
+    seq: Mapped[int] = mapped_column(
+        BigInteger, change_seq, server_default=change_seq.next_value(), primary_key=True
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("user.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    transaction_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
     def __repr__(self) -> str:
-        return f"<Transaction id={self.id} user_id={self.user_id} type={self.type} amount={self.amount}>"
\ No newline at end of file
+        return f"<TransactionTombstone seq={self.seq} user_id={self.user_id} transaction_id={self.transaction_id}>"
@@ -0,0 +1,53 @@
+# app/transactions/pagination.py
+import base64
+from datetime import date
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(tx_date: date, tx_id: int) -> str:
+    """
+    Encode the (date, id) of the last row of a page into an opaque token.
+    """
+    raw = f"{tx_date.isoformat()}|{tx_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[date, int]]:
+    """
+    Decode a token produced by encode_cursor.
+    An empty cursor means "first page" and decodes to None.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        tx_date, tx_id = raw.split("|", 1)
+        return date.fromisoformat(tx_date), int(tx_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def encode_sync_token(seq: int) -> str:
+    """
+    Opaque token for a position in the transaction change stream.
+    """
+    return base64.urlsafe_b64encode(f"s{seq}".encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> int:
+    """
+    Decode a token produced by encode_sync_token; an empty token is the beginning (0).
+    """
+    if not token:
+        return 0
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        if not raw.startswith("s"):
+            raise ValueError(raw)
+        return int(raw[1:])
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync token")
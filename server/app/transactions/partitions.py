@@ -0,0 +1,349 @@
+# app/transactions/partitions.py
+"""
+Range partitioning of the transactions table by date.
+
+`transactions` is declared PARTITION BY RANGE (date) with one partition per
+year (or month, settings.TRANSACTION_PARTITION_INTERVAL) plus a DEFAULT
+partition that catches dates no partition covers yet. Queries bounded by date
+only touch the partitions of that range.
+
+    python -m app.transactions.partitions maintain
+        create partitions for the current and the next TRANSACTION_PARTITIONS_AHEAD
+        periods, and move rows that landed in the default partition into their own
+        partitions (also run by `python -m app.migrate`, and by the API workers
+        every TRANSACTION_PARTITION_MAINTENANCE_SECONDS, see PartitionMaintenance)
+
+    python -m app.transactions.partitions migrate [--keep-legacy]
+        convert an existing unpartitioned transactions table, in one transaction
+
+    python -m app.transactions.partitions detach --before 2019-01-01 [--drop]
+        detach partitions that end on or before the date; they are renamed to
+        transactions_archive_* (or dropped). Monthly rollups keep their totals.
+"""
+import argparse
+import asyncio
+import logging
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app import db
+from app.config import settings
+from app.db import Base, dispose_engines, init_engines
+from app.transactions.models import Transaction
+
+logger = logging.getLogger("app.transactions.partitions")
+
+TABLE = "transactions"
+DEFAULT_PARTITION = "transactions_default"
+LEGACY_TABLE = "transactions_unpartitioned"
+
+# every stored column; the generated search_vector is recomputed on insert
+STORED_COLUMNS = [c for c in Transaction.__table__.columns if c.computed is None]
+COLUMNS = ", ".join(c.name for c in STORED_COLUMNS)
+
+# serializes partition maintenance: the migrate step, manual runs and the
+# workers' periodic runs (where only one worker does the work, the others skip)
+ADVISORY_LOCK_ID = 7_301_405
+
+_BOUND = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})'\) TO \('(\d{4}-\d{2}-\d{2})'\)")
+
+
+def period_start(d: date, interval: str) -> date:
+    return date(d.year, d.month, 1) if interval == "month" else date(d.year, 1, 1)
+
+
+def next_period(start: date, interval: str) -> date:
+    return start + (relativedelta(months=1) if interval == "month" else relativedelta(years=1))
+
+
+def partition_name(start: date, interval: str) -> str:
+    if interval == "month":
+        return f"{TABLE}_y{start.year}m{start.month:02d}"
+    return f"{TABLE}_y{start.year}"
+
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    result = await conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": TABLE}
+    )
+    return result.scalar() == "p"
+
+
+async def list_partitions(conn: AsyncConnection) -> List[Tuple[str, Optional[date], Optional[date]]]:
+    """
+    (name, start, end) of every partition; start/end are None for the default one.
+    """
+    result = await conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table) ORDER BY c.relname"
+    ), {"table": TABLE})
+    partitions = []
+    for name, bound in result.all():
+        match = _BOUND.search(bound or "")
+        if match:
+            partitions.append((name, date.fromisoformat(match[1]), date.fromisoformat(match[2])))
+        else:
+            partitions.append((name, None, None))
+    return partitions
+
+
+async def _has_default(conn: AsyncConnection) -> bool:
+    result = await conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION})
+    return bool(result.scalar())
+
+
+async def create_partition(conn: AsyncConnection, start: date, interval: str) -> bool:
+    """
+    Create the partition for the period starting at `start`, if missing.
+
+    A new range may not overlap rows already sitting in the default partition,
+    so those are taken out first and re-inserted once the partition exists.
+    """
+    name = partition_name(start, interval)
+    exists = await conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+    if exists.scalar():
+        return False
+
+    end = next_period(start, interval)
+    bounds = {"start": start, "end": end}
+    moved = 0
+    if await _has_default(conn):
+        await conn.execute(text(
+            f"CREATE TEMP TABLE _moved_transactions AS SELECT {COLUMNS} FROM {DEFAULT_PARTITION} "
+            "WHERE date >= :start AND date < :end"
+        ), bounds)
+        result = await conn.execute(
+            text(f"DELETE FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end"), bounds
+        )
+        moved = result.rowcount
+
+    # DDL can't take bind parameters; the bounds are formatted from date objects
+    await conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+
+    if await _has_default(conn):
+        if moved:
+            await conn.execute(text(
+                f"INSERT INTO {TABLE} ({COLUMNS}) SELECT {COLUMNS} FROM _moved_transactions"
+            ))
+        await conn.execute(text("DROP TABLE _moved_transactions"))
+
+    logger.info("created partition %s (%s .. %s), moved %d rows from default", name, start, end, moved)
+    return True
+
+
+async def ensure_range(conn: AsyncConnection, first: date, last: date, interval: Optional[str] = None) -> List[str]:
+    """
+    Make sure partitions exist for every period between two dates (inclusive).
+    """
+    interval = interval or settings.TRANSACTION_PARTITION_INTERVAL
+    await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"))
+    created = []
+    start = period_start(first, interval)
+    while start <= last:
+        if await create_partition(conn, start, interval):
+            created.append(partition_name(start, interval))
+        start = next_period(start, interval)
+    return created
+
+
+async def maintain(conn: AsyncConnection, today: Optional[date] = None) -> List[str]:
+    """
+    Create upcoming partitions and split rows out of the default partition.
+    Returns the names of created partitions.
+    """
+    if not await is_partitioned(conn):
+        logger.warning(
+            "%s is not partitioned; run `python -m app.transactions.partitions migrate`", TABLE
+        )
+        return []
+
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+    interval = settings.TRANSACTION_PARTITION_INTERVAL
+    today = today or date.today()
+    start = period_start(today, interval)
+    last = start
+    for _ in range(settings.TRANSACTION_PARTITIONS_AHEAD):
+        last = next_period(last, interval)
+    created = await ensure_range(conn, start, last, interval)
+
+    # dates outside the managed window (old imports, typos) end up in default
+    result = await conn.execute(text(
+        f"SELECT DISTINCT date_trunc(:interval, date)::date FROM {DEFAULT_PARTITION}"
+    ), {"interval": interval})
+    for (stray,) in result.all():
+        if await create_partition(conn, stray, interval):
+            created.append(partition_name(stray, interval))
+    return created
+
+
+async def maintain_unless_running(conn: AsyncConnection) -> Optional[List[str]]:
+    """
+    `maintain`, unless another session holds the maintenance lock (then None).
+    """
+    result = await conn.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+    if not result.scalar():
+        return None
+    return await maintain(conn)
+
+
+class PartitionMaintenance:
+    """
+    Background task of every API worker: runs `maintain` every `interval_seconds`,
+    so upcoming partitions exist before rows for them arrive on a deployment that
+    runs for longer than TRANSACTION_PARTITIONS_AHEAD periods. Workers that find
+    the advisory lock taken skip that round.
+    """
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._task = None
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                async with db.engine.begin() as conn:
+                    created = await maintain_unless_running(conn)
+                if created:
+                    logger.info("partition maintenance created %s", created)
+            except Exception:
+                logger.exception("partition maintenance failed")
+
+    def start(self) -> None:
+        if self._task is None and self.interval_seconds:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+partition_maintenance = PartitionMaintenance(settings.TRANSACTION_PARTITION_MAINTENANCE_SECONDS)
+
+
+async def copy_columns(conn: AsyncConnection, table: str) -> str:
+    """
+    Stored columns that `table` (an older transactions table) has, as a SELECT
+    list; the missing ones take their defaults in the copy. Raises if one of
+    them has no default (e.g. category_id: convert categories first).
+    """
+    result = await conn.execute(
+        text(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :table"
+        ),
+        {"table": table},
+    )
+    existing = set(result.scalars().all())
+    required = [
+        c.name for c in STORED_COLUMNS
+        if c.name not in existing and not c.nullable and c.server_default is None
+    ]
+    if required:
+        raise RuntimeError(
+            f"{table} lacks {', '.join(required)}, which have no default; "
+            "run database/scripts/migrate_categories.sql first"
+        )
+    return ", ".join(c.name for c in STORED_COLUMNS if c.name in existing)
+
+
+async def migrate(conn: AsyncConnection, keep_legacy: bool = False) -> None:
+    """
+    Turn a plain transactions table into the partitioned layout and copy its rows.
+    Columns added since the table was created (change_seq, currency, ...) are
+    filled with their defaults.
+    """
+    if await is_partitioned(conn):
+        logger.info("%s is already partitioned", TABLE)
+        return
+    columns = await copy_columns(conn, TABLE)
+
+    # move the old table and everything named after it out of the way
+    await conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}"))
+    await conn.execute(text(f"ALTER SEQUENCE IF EXISTS {TABLE}_id_seq RENAME TO {LEGACY_TABLE}_id_seq"))
+    indexes = await conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = :table"), {"table": LEGACY_TABLE}
+    )
+    for (index,) in indexes.all():
+        await conn.execute(text(f'ALTER INDEX "{index}" RENAME TO "legacy_{index}"'))
+
+    await conn.run_sync(Base.metadata.create_all, tables=[Transaction.__table__])
+
+    bounds = await conn.execute(text(f"SELECT min(date), max(date) FROM {LEGACY_TABLE}"))
+    first, last = bounds.one()
+    today = date.today()
+    await ensure_range(conn, min(first or today, today), max(last or today, today))
+    await maintain(conn)
+
+    await conn.execute(text(f"INSERT INTO {TABLE} ({columns}) SELECT {columns} FROM {LEGACY_TABLE}"))
+    await conn.execute(text(
+        f"SELECT setval('{TABLE}_id_seq', coalesce((SELECT max(id) FROM {TABLE}), 0) + 1, false)"
+    ))
+
+    old_count = (await conn.execute(text(f"SELECT count(*) FROM {LEGACY_TABLE}"))).scalar()
+    new_count = (await conn.execute(text(f"SELECT count(*) FROM {TABLE}"))).scalar()
+    if old_count != new_count:
+        raise RuntimeError(f"row count mismatch after copy: {old_count} -> {new_count}")
+
+    if not keep_legacy:
+        await conn.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+    logger.info("migrated %d rows into partitioned %s", new_count, TABLE)
+
+
+async def detach_before(conn: AsyncConnection, before: date, drop: bool = False) -> List[str]:
+    """
+    Detach every partition whose range ends on or before `before`.
+    """
+    detached = []
+    for name, start, end in await list_partitions(conn):
+        if end is None or end > before:
+            continue
+        await conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+        if drop:
+            await conn.execute(text(f"DROP TABLE {name}"))
+        else:
+            # renamed so a new partition for the same range can be created later
+            archive = name.replace(f"{TABLE}_", f"{TABLE}_archive_", 1)
+            await conn.execute(text(f"ALTER TABLE {name} RENAME TO {archive}"))
+        detached.append(name)
+    return detached
+
+
+async def _main(args) -> None:
+    import app.users.models  # noqa: F401  (registers the "user" table for the FK)
+
+    async with init_engines().begin() as conn:
+        if args.command == "maintain":
+            print("created:", await maintain(conn) or "nothing")
+        elif args.command == "migrate":
+            await migrate(conn, keep_legacy=args.keep_legacy)
+            print("migrated; partitions:", [name for name, _, _ in await list_partitions(conn)])
+        elif args.command == "detach":
+            print("detached:", await detach_before(conn, args.before, drop=args.drop) or "nothing")
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Manage transactions table partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("maintain", help="create upcoming partitions, split the default partition")
+    migrate_parser = commands.add_parser("migrate", help="partition an existing transactions table")
+    migrate_parser.add_argument("--keep-legacy", action="store_true", help=f"keep {LEGACY_TABLE}")
+    detach_parser = commands.add_parser("detach", help="archive old partitions")
+    detach_parser.add_argument("--before", type=date.fromisoformat, required=True)
+    detach_parser.add_argument("--drop", action="store_true", help="drop instead of keeping an archive table")
+    asyncio.run(_main(parser.parse_args()))
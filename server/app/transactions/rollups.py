@@ -0,0 +1,158 @@
+# app/transactions/rollups.py
+"""
+Maintenance of the transaction_monthly_rollups table.
+
+Write paths collect (user, month, type, category id, currency) -> (amount, count) deltas and
+apply them in the same DB transaction as the change itself. To (re)build the
+table from raw transactions, e.g. after first deploying it:
+
+    python -m app.transactions.rollups [--user <uuid>]
+"""
+import argparse
+import asyncio
+import uuid
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import delete, func, insert, literal, select, union_all, cast, Date
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import Base, async_session_maker, dispose_engines, init_engines
+from app.transactions.models import Transaction, TransactionMonthlyRollup as Rollup
+
+RollupKey = Tuple[uuid.UUID, date, str, int, str]
+
+
+def month_of(d: date) -> date:
+    return d.replace(day=1)
+
+
+def months_to_date(user_id, start: date, today: date):
+    """
+    The user's rollup rows from `start` through the current month, less the
+    transactions dated after `today` in the current month, so the current month
+    counts up to today (as a `date <= today` filter on raw rows would).
+    Future-dated rows are few, so the correction is a short index range scan.
+    Returns a subquery (month, type, category_id, currency, total, tx_count) in
+    which a key may appear twice: sum `total` and `tx_count`.
+    """
+    this_month = month_of(today)
+    stored = select(
+        Rollup.month, Rollup.type, Rollup.category_id, Rollup.currency, Rollup.total, Rollup.tx_count,
+    ).where(
+        Rollup.user_id == user_id,
+        Rollup.month >= start,
+        Rollup.month <= today,
+    )
+    future = select(
+        literal(this_month, Date),
+        Transaction.type,
+        Transaction.category_id,
+        Transaction.currency,
+        -Transaction.amount,
+        literal(-1),
+    ).where(
+        Transaction.user_id == user_id,
+        Transaction.date > today,
+        Transaction.date < this_month + relativedelta(months=1),
+    )
+    return union_all(stored, future).subquery("months_to_date")
+
+
+class RollupDeltas:
+    """
+    Accumulates signed changes to rollup rows before writing them in one statement.
+    """
+    def __init__(self):
+        self._deltas: Dict[RollupKey, list] = defaultdict(lambda: [Decimal(0), 0])
+
+    def add(self, user_id, tx_date: date, type: str, category_id: int, currency: str, amount, sign: int = 1):
+        entry = self._deltas[(user_id, month_of(tx_date), type, category_id, currency)]
+        entry[0] += sign * Decimal(str(amount))
+        entry[1] += sign
+
+    def add_transaction(self, tx, sign: int = 1):
+        self.add(tx.user_id, tx.date, tx.type, tx.category_id, tx.currency, tx.amount, sign)
+
+    def categories(self, type: str) -> set:
+        """
+        Category ids with pending changes for the given transaction type.
+        """
+        return {c for (_, _, t, c, _) in self._deltas if t == type}
+
+    def __bool__(self):
+        return any(amount or count for amount, count in self._deltas.values())
+
+    async def apply(self, session: AsyncSession) -> None:
+        """
+        Upsert all accumulated deltas; concurrent writers add up correctly.
+        """
+        values = [
+            {"user_id": u, "month": m, "type": t, "category_id": c, "currency": cur, "total": amount, "tx_count": count}
+            for (u, m, t, c, cur), (amount, count) in self._deltas.items()
+            if amount or count
+        ]
+        self._deltas.clear()
+        if not values:
+            return
+
+        stmt = pg_insert(Rollup).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Rollup.user_id, Rollup.month, Rollup.type, Rollup.category_id, Rollup.currency],
+            set_={
+                "total": Rollup.total + stmt.excluded.total,
+                "tx_count": Rollup.tx_count + stmt.excluded.tx_count,
+            },
+        )
+        await session.execute(stmt)
+
+
+async def rebuild(session: AsyncSession, user_id: Optional[uuid.UUID] = None) -> None:
+    """
+    Recompute rollups from raw transactions (for one user or everyone).
+    """
+    month = cast(func.date_trunc("month", Transaction.date), Date)
+    source = select(
+        Transaction.user_id,
+        month,
+        Transaction.type,
+        Transaction.category_id,
+        Transaction.currency,
+        func.sum(Transaction.amount),
+        func.count(),
+    ).group_by(Transaction.user_id, month, Transaction.type, Transaction.category_id, Transaction.currency)
+
+    clear = delete(Rollup)
+    if user_id is not None:
+        source = source.where(Transaction.user_id == user_id)
+        clear = clear.where(Rollup.user_id == user_id)
+
+    await session.execute(clear)
+    await session.execute(
+        insert(Rollup).from_select(
+            ["user_id", "month", "type", "category_id", "currency", "total", "tx_count"], source
+        )
+    )
+
+
+async def _main(user_id: Optional[uuid.UUID]) -> None:
+    import app.users.models  # noqa: F401  (registers the "user" table for the FK)
+
+    async with init_engines().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[Rollup.__table__])
+
+    async with async_session_maker() as session:
+        await rebuild(session, user_id)
+        await session.commit()
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild transaction monthly rollups")
+    parser.add_argument("--user", type=uuid.UUID, default=None, help="only rebuild this user")
+    args = parser.parse_args()
+    asyncio.run(_main(args.user))
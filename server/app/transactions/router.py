@@ -1,78 +1,284 @@
 # app/transactions/router.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Optional
-from sqlalchemy import select, and_, or_, desc
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Union
+from sqlalchemy import select, and_, or_, desc, tuple_, cast, Float
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from datetime import date
 
+from app.admission import admission_control
+from app.budgets.alerts import alert_queue
+from app.cache import response_cache
+from app.categories.lookup import id_of, replace_names
+from app.categories.models import Category
+from app.currencies.rates import rate_cache
 from app.db import async_session_maker
+from app.replica import read_router
+from app.repository import OwnedRepository
+from app.serialization import FastJSONResponse, columns, records
+from app.transactions import batch as batch_ops
 from app.transactions import models, schemas
+from app.transactions import search as fts
+from app.transactions.pagination import encode_cursor, decode_cursor, encode_sync_token, decode_sync_token
+from app.transactions.importer import import_rows, iter_csv_rows, iter_ndjson_rows
+from app.transactions.exporter import EXPORT_COLUMNS, stream_csv, stream_ndjson
+from app.transactions.rollups import RollupDeltas
+from app.transactions.sync import begin_transaction_write, changes_since, record_deletions
 from app.users.router import fastapi_users  # import the FastAPIUsers instance
+from app.watermarks import conditional_get
 # Create a dependency to fetch the current active user
 current_active_user = fastapi_users.current_user(active=True)
 
-router = APIRouter(prefix="/transactions", tags=["transactions"])
+# per-user rate / concurrency limits, see app/admission.py
+router = APIRouter(
+    prefix="/transactions", tags=["transactions"], dependencies=[Depends(admission_control(current_active_user))]
+)
+
+repo = OwnedRepository(models.Transaction, not_found="Transaction not found")
+
+# columns whose old values are needed to move a row between rollup buckets
+ROLLUP_FIELDS = ("date", "type", "category_id", "currency", "amount")
 
 # helper to get db session
 async def get_session() -> AsyncSession:
     async with async_session_maker() as session:
         yield session
 
+
+# GET handlers read through here: replica when configured, primary after the user's own writes
+async def get_read_session(current_user = Depends(current_active_user)) -> AsyncSession:
+    async with read_router.session(current_user.id) as session:
+        yield session
+
+# ETag / 304 support for reads that only depend on the user's transactions
+transactions_etag = conditional_get("transactions", get_read_session, current_active_user)
+
+# -----------------------------
+# FILTERS (shared by list and other read endpoints)
+# -----------------------------
+class TransactionFilters:
+    """
+    Query-string filters for transaction reads. Use as `Depends()`.
+    """
+    def __init__(
+        self,
+        current_user = Depends(current_active_user),
+        type: Optional[str] = Query(None, description="INCOME or EXPENSE"),
+        category: Optional[str] = Query(None),
+        date_from: Optional[date] = Query(None),
+        date_to: Optional[date] = Query(None),
+        min_amount: Optional[float] = Query(None, ge=0),
+        max_amount: Optional[float] = Query(None, ge=0),
+        search: Optional[str] = Query(None, description="full-text prefix search in note or category"),
+    ):
+        self.user_id = current_user.id
+        self.type = type
+        self.category = category
+        self.date_from = date_from
+        self.date_to = date_to
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+        self.search = search
+
+    def apply(self, q):
+        if self.type:
+            q = q.where(models.Transaction.type == self.type.upper())
+
+        if self.category:
+            q = q.where(models.Transaction.category_id == id_of(self.user_id, self.category))
+
+        if self.date_from:
+            q = q.where(models.Transaction.date >= self.date_from)
+
+        if self.date_to:
+            q = q.where(models.Transaction.date <= self.date_to)
+
+        if self.min_amount is not None:
+            q = q.where(models.Transaction.amount >= self.min_amount)
+
+        if self.max_amount is not None:
+            q = q.where(models.Transaction.amount <= self.max_amount)
+
+        if self.search:
+            # prefix full-text match on note/category, served by the GIN index
+            query = fts.tsquery(self.search)
+            if query is not None:
+                q = q.where(fts.matches(query, self.user_id))
+        return q
+
 # -----------------------------
 # LIST / FILTER / PAGINATE
 # -----------------------------
-@router.get("/", response_model=List[schemas.TransactionRead])
+# TransactionRead fields, selected as plain columns for the fast list path
+LIST_COLUMNS = (
+    models.Transaction.id,
+    models.Transaction.user_id,
+    models.Transaction.type,
+    models.Transaction.category,
+    models.Transaction.category_id,
+    cast(models.Transaction.amount, Float).label("amount"),
+    models.Transaction.currency,
+    models.Transaction.date,
+    models.Transaction.note,
+    models.Transaction.created_at,
+    models.Transaction.updated_at,
+)
+LIST_FIELDS = tuple(c.key for c in LIST_COLUMNS)
+
+
+@router.get(
+    "/",
+    response_model=Union[List[schemas.TransactionRead], schemas.TransactionPage, schemas.TransactionColumns],
+)
 async def list_transactions(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user = Depends(current_active_user),
-    type: Optional[str] = Query(None, description="INCOME or EXPENSE"),
-    category: Optional[str] = Query(None),
-    date_from: Optional[date] = Query(None),
-    date_to: Optional[date] = Query(None),
-    min_amount: Optional[float] = Query(None, ge=0),
-    max_amount: Optional[float] = Query(None, ge=0),
-    search: Optional[str] = Query(None, description="search in note or category"),
+    filters: TransactionFilters = Depends(),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset pagination token. Pass an empty value for the first page, "
+                    "then the returned next_cursor. Ignores skip.",
+    ),
+    format: str = Query("json", pattern="^(json|columnar)$"),
+    cache_headers: dict = Depends(transactions_etag),
 ):
     """
     Returns list of transactions for current user with optional filters and pagination.
+
+    Without `cursor` the response is a plain list paginated by skip/limit.
+    With `cursor` the response is { items: [...], next_cursor: str | null } and
+    pages are fetched by seeking past the last (date, id), so deep pages cost
+    the same as the first one.
+
+    format=columnar returns { columns: { id: [...], date: [...], ... }, next_cursor }
+    instead: one array per field, much smaller for large pages.
     """
-    q = select(models.Transaction).where(models.Transaction.user_id == current_user.id)
+    q = select(*LIST_COLUMNS).where(models.Transaction.user_id == current_user.id)
+    q = filters.apply(q)
+    q = q.order_by(desc(models.Transaction.date), desc(models.Transaction.id))
 
-    if type:
-        q = q.where(models.Transaction.type == type.upper())
+    next_cursor = None
+    if cursor is None:
+        result = await session.execute(q.offset(skip).limit(limit))
+        rows = result.all()
+    else:
+        after = decode_cursor(cursor)
+        if after is not None:
+            q = q.where(tuple_(models.Transaction.date, models.Transaction.id) < tuple_(*after))
 
-    if category:
-        q = q.where(models.Transaction.category == category)
+        # fetch one extra row to know whether another page exists
+        result = await session.execute(q.limit(limit + 1))
+        rows = result.all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
 
-    if date_from:
-        q = q.where(models.Transaction.date >= date_from)
+    # rows are serialized directly, without building a TransactionRead per row
+    if format == "columnar":
+        body = {"columns": columns(rows, LIST_FIELDS), "next_cursor": next_cursor}
+    elif cursor is None:
+        body = records(rows, LIST_FIELDS)
+    else:
+        body = {"items": records(rows, LIST_FIELDS), "next_cursor": next_cursor}
+    # returned directly, so the ETag headers have to be passed explicitly
+    return FastJSONResponse(body, headers=cache_headers)
 
-    if date_to:
-        q = q.where(models.Transaction.date <= date_to)
+# -----------------------------
+# FULL-TEXT SEARCH
+# -----------------------------
+@router.get("/search", response_model=List[schemas.TransactionRead])
+async def search_transactions(
+    q: str = Query(..., min_length=1, description="words to find in note or category (prefix match)"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user = Depends(current_active_user),
+    filters: TransactionFilters = Depends(),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """
+    Ranked full-text search over note and category. Every word must match
+    the note, or the category name, each as a prefix ("gro" finds "groceries").
+    Best matches first, then newest.
+    """
+    query = fts.tsquery(q)
+    if query is None:
+        return []
 
-    if min_amount is not None:
-        q = q.where(models.Transaction.amount >= min_amount)
+    stmt = (
+        select(models.Transaction)
+        .where(models.Transaction.user_id == current_user.id, fts.matches(query, current_user.id))
+    )
+    stmt = filters.apply(stmt)
+    stmt = stmt.order_by(
+        desc(fts.rank(query)), desc(models.Transaction.date), desc(models.Transaction.id)
+    ).limit(limit)
 
-    if max_amount is not None:
-        q = q.where(models.Transaction.amount <= max_amount)
+    result = await session.execute(stmt)
+    return result.scalars().all()
 
-    if search:
-        term = f"%{search.lower()}%"
-        q = q.where(
-            or_(
-                models.Transaction.note.ilike(term),
-                models.Transaction.category.ilike(term),
-            )
-        )
+# -----------------------------
+# STREAMING EXPORT
+# -----------------------------
+@router.get("/export")
+async def export_transactions(
+    current_user = Depends(current_active_user),
+    filters: TransactionFilters = Depends(),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+):
+    """
+    Streams every matching transaction as CSV or NDJSON.
+
+    Rows are read from a server-side cursor as plain column tuples (no ORM
+    objects) and written out as they arrive, so memory stays constant.
+    """
+    # category names through a join rather than one sub-select per exported row
+    q = (
+        select(*(
+            Category.name if c == "category" else getattr(models.Transaction, c) for c in EXPORT_COLUMNS
+        ))
+        .join(Category, Category.id == models.Transaction.category_id)
+        .where(models.Transaction.user_id == current_user.id)
+    )
+    q = filters.apply(q)
+    q = q.order_by(desc(models.Transaction.date), desc(models.Transaction.id))
 
-    q = q.order_by(desc(models.Transaction.date), desc(models.Transaction.id)).offset(skip).limit(limit)
+    if format == "csv":
+        body, media_type = stream_csv(q, current_user.id), "text/csv"
+    else:
+        body, media_type = stream_ndjson(q, current_user.id), "application/x-ndjson"
 
-    result = await session.execute(q)
-    rows = result.scalars().all()
-    return rows
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'},
+    )
+
+# -----------------------------
+# DELTA SYNC (offline clients)
+# -----------------------------
+@router.get("/changes", response_model=schemas.TransactionChanges)
+async def transaction_changes(
+    since: str = Query("", description="next_token from the previous call; empty for a full sync"),
+    limit: int = Query(500, ge=1, le=5000),
+    session: AsyncSession = Depends(get_read_session),
+    current_user = Depends(current_active_user),
+):
+    """
+    Transactions created or updated after `since`, plus ids deleted after it,
+    and the token to pass next time. When has_more is true, call again
+    right away with next_token to fetch the next page.
+    """
+    page = await changes_since(
+        session, current_user.id, decode_sync_token(since), limit, LIST_COLUMNS
+    )
+    return FastJSONResponse({
+        "changed": records(page["changed"], LIST_FIELDS),
+        "deleted": page["deleted"],
+        "next_token": encode_sync_token(page["last_seq"]),
+        "has_more": page["has_more"],
+    })
 
 # -----------------------------
 # GET ONE
@@ -80,15 +286,10 @@ async def list_transactions(
 @router.get("/{transaction_id}", response_model=schemas.TransactionRead)
 async def get_transaction(
     transaction_id: int,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user = Depends(current_active_user),
 ):
-    q = select(models.Transaction).where(models.Transaction.id == transaction_id)
-    result = await session.execute(q)
-    tx = result.scalar_one_or_none()
-    if not tx or tx.user_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
-    return tx
+    return await repo.get(session, transaction_id, current_user.id)
 
 # -----------------------------
 # CREATE
@@ -99,19 +300,136 @@ async def create_transaction(
     session: AsyncSession = Depends(get_session),
     current_user = Depends(current_active_user),
 ):
-    tx = models.Transaction(
-        user_id=current_user.id,
-        type=payload.type.upper(),
-        category=payload.category,
-        amount=payload.amount,
-        date=payload.date,
-        note=payload.note
-    )
-    session.add(tx)
+    await rate_cache.require(session, [payload.currency])
+    await begin_transaction_write(session, current_user.id)
+    values = {
+        "type": payload.type.upper(),
+        "category": payload.category,
+        "amount": payload.amount,
+        "currency": payload.currency,
+        "date": payload.date,
+        "note": payload.note,
+    }
+    await replace_names(session, current_user.id, [values])
+    tx = await repo.create(session, current_user.id, values)
+
+    deltas = RollupDeltas()
+    deltas.add_transaction(tx)
+    await deltas.apply(session)
+
     await session.commit()
-    await session.refresh(tx)
+    await response_cache.invalidate_user(current_user.id, "dashboard", "budgets")
+    if tx.type == "EXPENSE":
+        alert_queue.enqueue(current_user.id, tx.category_id)
     return tx
 
+# -----------------------------
+# BULK IMPORT (CSV / NDJSON)
+# -----------------------------
+@router.post("/import", response_model=schemas.ImportResult)
+async def import_transactions(
+    request: Request,
+    response: Response,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    atomic: bool = Query(False, description="Reject the whole file if any row fails"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+    session: AsyncSession = Depends(get_session),
+    current_user = Depends(current_active_user),
+):
+    """
+    Streams the raw request body and loads it via COPY in batches.
+
+    CSV needs a header row with the TransactionCreate field names
+    (type, category, amount, date, note, and optionally currency). NDJSON
+    takes one object per line.
+    Returns counts and a per-line error report; with atomic=true nothing is
+    stored when any row fails and the status is 422.
+    """
+    parse = iter_csv_rows if format == "csv" else iter_ndjson_rows
+    expense_categories = set()
+    report = await import_rows(
+        session,
+        current_user.id,
+        parse(request.stream()),
+        atomic=atomic,
+        batch_size=batch_size,
+        expense_categories=expense_categories,
+    )
+    if report["committed"]:
+        await response_cache.invalidate_user(current_user.id, "dashboard", "budgets")
+        for category_id in expense_categories:
+            alert_queue.enqueue(current_user.id, category_id)
+    else:
+        response.status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    return report
+
+# -----------------------------
+# BATCH (creates / updates / deletes / filter-based bulk changes)
+# -----------------------------
+def _bulk_filters(current_user, bulk_filter: schemas.TransactionBulkFilter) -> TransactionFilters:
+    conditions = bulk_filter.model_dump()
+    if all(v is None or v == "" for v in conditions.values()):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bulk filter needs at least one condition",
+        )
+    return TransactionFilters(current_user, **conditions)
+
+
+@router.post("/batch", response_model=schemas.TransactionBatchResult)
+async def batch_transactions(
+    payload: schemas.TransactionBatch,
+    session: AsyncSession = Depends(get_session),
+    current_user = Depends(current_active_user),
+):
+    """
+    Apply many changes in one DB transaction, in this order: create, update,
+    delete, update_where, delete_where. Each list is one set-based statement.
+
+    Per-item results follow request order; ids that don't exist or belong to
+    another user are reported as not_found and skipped. update_where and
+    delete_where return the number of rows they matched.
+    """
+    update_filters = (
+        _bulk_filters(current_user, payload.update_where.filter) if payload.update_where else None
+    )
+    delete_filters = _bulk_filters(current_user, payload.delete_where) if payload.delete_where else None
+    currencies = {item.currency for item in payload.create}
+    currencies.update(item.currency for item in payload.update if item.currency)
+    if payload.update_where and payload.update_where.values.currency:
+        currencies.add(payload.update_where.values.currency)
+    await rate_cache.require(session, currencies)
+
+    if payload.create or payload.update or payload.delete or update_filters or delete_filters:
+        await begin_transaction_write(session, current_user.id)
+
+    deltas = RollupDeltas()
+    results = []
+    results += await batch_ops.create_many(session, current_user.id, payload.create, deltas)
+    results += await batch_ops.update_many(session, current_user.id, payload.update, deltas)
+    results += await batch_ops.delete_many(session, current_user.id, payload.delete, deltas)
+
+    updated_where = deleted_where = 0
+    if update_filters:
+        updated_where = await batch_ops.update_where(
+            session, current_user.id, update_filters.apply, payload.update_where.values, deltas
+        )
+    if delete_filters:
+        deleted_where = await batch_ops.delete_where(
+            session, current_user.id, delete_filters.apply, deltas
+        )
+
+    expense_categories = deltas.categories("EXPENSE")
+    changed = updated_where or deleted_where or any(r["status"] != "not_found" for r in results)
+    await deltas.apply(session)
+    await session.commit()
+
+    if changed:
+        await response_cache.invalidate_user(current_user.id, "dashboard", "budgets")
+        for category_id in expense_categories:
+            alert_queue.enqueue(current_user.id, category_id)
+    return {"results": results, "updated_where": updated_where, "deleted_where": deleted_where}
+
 # -----------------------------
 # UPDATE
 # -----------------------------
@@ -122,19 +440,29 @@ async def update_transaction(
     session: AsyncSession = Depends(get_session),
     current_user = Depends(current_active_user),
 ):
-    q = select(models.Transaction).where(models.Transaction.id == transaction_id)
-    result = await session.execute(q)
-    tx = result.scalar_one_or_none()
-    if not tx or tx.user_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
-
-    # apply updates
-    data = payload.dict(exclude_unset=True)
-    for key, val in data.items():
-        setattr(tx, key, val)
-    session.add(tx)
+    data = payload.model_dump(exclude_unset=True)
+    if data.get("type"):
+        data["type"] = data["type"].upper()
+    if data.get("currency"):
+        await rate_cache.require(session, [data["currency"]])
+    await begin_transaction_write(session, current_user.id)
+    await replace_names(session, current_user.id, [data])
+    tx, old = await repo.update_with_previous(
+        session, transaction_id, current_user.id, data, previous=ROLLUP_FIELDS
+    )
+
+    # move the old values out of the rollup and the new ones in
+    deltas = RollupDeltas()
+    deltas.add(
+        current_user.id, old["date"], old["type"], old["category_id"], old["currency"], old["amount"], sign=-1
+    )
+    deltas.add_transaction(tx)
+    await deltas.apply(session)
+
     await session.commit()
-    await session.refresh(tx)
+    await response_cache.invalidate_user(current_user.id, "dashboard", "budgets")
+    if tx.type == "EXPENSE":
+        alert_queue.enqueue(current_user.id, tx.category_id)
     return tx
 
 # -----------------------------
@@ -146,12 +474,14 @@ async def delete_transaction(
     session: AsyncSession = Depends(get_session),
     current_user = Depends(current_active_user),
 ):
-    q = select(models.Transaction).where(models.Transaction.id == transaction_id)
-    result = await session.execute(q)
-    tx = result.scalar_one_or_none()
-    if not tx or tx.user_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
+    await begin_transaction_write(session, current_user.id)
+    tx = await repo.delete(session, transaction_id, current_user.id)
+    await record_deletions(session, current_user.id, [tx.id])
+
+    deltas = RollupDeltas()
+    deltas.add_transaction(tx, sign=-1)
+    await deltas.apply(session)
 
-    await session.delete(tx)
     await session.commit()
+    await response_cache.invalidate_user(current_user.id, "dashboard", "budgets")
     return None
\ No newline at end of file
@@ -2,10 +2,13 @@
 from __future__ import annotations
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Dict, List, Optional
 import datetime
 from uuid import UUID
 
+from app.config import settings
+from app.currencies.schemas import CURRENCY_PATTERN
+
 # avoid naming collision with 'date'
 date_type = datetime.date
 
@@ -13,6 +16,7 @@ class TransactionCreate(BaseModel):
     type: str = Field(..., example="EXPENSE")
     category: str = Field(..., example="Food")
     amount: float = Field(..., ge=0)
+    currency: str = Field(settings.BASE_CURRENCY, pattern=CURRENCY_PATTERN, example="USD")
     date: date_type = Field(..., example="2025-01-10")
     note: Optional[str] = None
 
@@ -20,6 +24,7 @@ class TransactionUpdate(BaseModel):
     type: Optional[str] = None
     category: Optional[str] = None
     amount: Optional[float] = Field(None, ge=0)
+    currency: Optional[str] = Field(None, pattern=CURRENCY_PATTERN)
     date: Optional[date_type] = None
     note: Optional[str] = None
 
@@ -30,8 +35,88 @@ class TransactionRead(BaseModel):
     user_id: UUID
     type: str
     category: str
+    category_id: int  # stable across renames; sync clients map it through /categories
     amount: float
+    currency: str
     date: date_type
     note: Optional[str] = None
     created_at: Optional[datetime.datetime] = None
-    updated_at: Optional[datetime.datetime] = None
\ No newline at end of file
+    updated_at: Optional[datetime.datetime] = None
+
+class TransactionPage(BaseModel):
+    items: List[TransactionRead]
+    next_cursor: Optional[str] = None
+
+
+class TransactionColumns(BaseModel):
+    """
+    Columnar page: one array per TransactionRead field, all the same length.
+    """
+    columns: Dict[str, List[Any]]
+    next_cursor: Optional[str] = None
+
+
+class TransactionChanges(BaseModel):
+    changed: List[TransactionRead]   # created or updated since the token, oldest change first
+    deleted: List[int]               # ids deleted since the token
+    next_token: str
+    has_more: bool
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    inserted: int
+    failed: int
+    committed: bool
+    errors: List[ImportRowError] = []
+
+
+# max items per list in a batch request
+BATCH_MAX_ITEMS = 1000
+
+
+class TransactionBatchUpdate(TransactionUpdate):
+    id: int
+
+
+class TransactionBulkFilter(BaseModel):
+    """
+    Same conditions as the list endpoint's query-string filters.
+    """
+    type: Optional[str] = None
+    category: Optional[str] = None
+    date_from: Optional[date_type] = None
+    date_to: Optional[date_type] = None
+    min_amount: Optional[float] = Field(None, ge=0)
+    max_amount: Optional[float] = Field(None, ge=0)
+    search: Optional[str] = None
+
+
+class TransactionBulkUpdate(BaseModel):
+    filter: TransactionBulkFilter
+    values: TransactionUpdate
+
+
+class TransactionBatch(BaseModel):
+    create: List[TransactionCreate] = Field([], max_length=BATCH_MAX_ITEMS)
+    update: List[TransactionBatchUpdate] = Field([], max_length=BATCH_MAX_ITEMS)
+    delete: List[int] = Field([], max_length=BATCH_MAX_ITEMS)
+    update_where: Optional[TransactionBulkUpdate] = None
+    delete_where: Optional[TransactionBulkFilter] = None
+
+
+class BatchItemResult(BaseModel):
+    op: str         # create | update | delete
+    index: int      # position in the request list
+    id: Optional[int] = None
+    status: str     # created | updated | deleted | not_found
+
+
+class TransactionBatchResult(BaseModel):
+    results: List[BatchItemResult]
+    updated_where: int = 0
+    deleted_where: int = 0
@@ -0,0 +1,49 @@
+# app/transactions/search.py
+import re
+from typing import Optional
+
+from sqlalchemy import func, select
+
+from app.categories.models import Category
+from app.transactions.models import Transaction
+
+# must match the configuration used by Transaction.search_vector
+TS_CONFIG = "simple"
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def prefix_tsquery(text: str) -> Optional[str]:
+    """
+    Turn free user input into a safe tsquery string where every word is a prefix
+    match and all words must be present: "gro sup" -> "gro:* & sup:*".
+    Returns None when the input has no searchable words.
+    """
+    words = _WORD.findall(text.lower())
+    if not words:
+        return None
+    return " & ".join(f"{w}:*" for w in words)
+
+
+def tsquery(text: str):
+    query = prefix_tsquery(text)
+    if query is None:
+        return None
+    return func.to_tsquery(TS_CONFIG, query)
+
+
+def matches(query, user_id):
+    """
+    WHERE clause: the note matches (GIN index on search_vector) or the row's
+    category name does. Category names are matched once, against the user's
+    small categories table, instead of being indexed into every transaction.
+    """
+    category_ids = select(Category.id).where(
+        Category.user_id == user_id,
+        func.to_tsvector(TS_CONFIG, Category.name).op("@@")(query),
+    )
+    return Transaction.search_vector.op("@@")(query) | Transaction.category_id.in_(category_ids)
+
+
+def rank(query):
+    return func.ts_rank(Transaction.search_vector, query)
@@ -1,8 +1,98 @@
+import time
+
+import jwt
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from fastapi_users import exceptions
 from fastapi_users.authentication import JWTStrategy, AuthenticationBackend, BearerTransport
+from fastapi_users.jwt import decode_jwt
+from app.cache import MemoryBackend
 from app.config import settings
 
+
+def _detached_copy(user):
+    """
+    Copy a loaded user into a new detached instance, so each request gets its own
+    object that can safely be added to that request's session.
+    """
+    mapper = inspect(user).mapper
+    copy = mapper.class_()
+    for attr in mapper.column_attrs:
+        setattr(copy, attr.key, getattr(user, attr.key))
+    make_transient_to_detached(copy)
+    return copy
+
+
+class UserCache:
+    """
+    Resolved active users keyed by (user id, token), held in a MemoryBackend so
+    they get the same LRU / TTL bounds as cached responses. `invalidate` bumps a
+    per-user generation that is part of the key, as ResponseCache does, so a
+    changed user's entries become unreachable without a scan.
+    In-process only; entries are dropped by UserManager hooks when a user changes,
+    which only reaches the worker that made the change: keep the TTL short, it is
+    how long a deactivated user may stay authenticated on the other workers.
+    """
+    def __init__(self, max_entries: int = 10000, ttl: int = 60, clock=time.monotonic):
+        self.ttl = ttl
+        self.backend = MemoryBackend(max_entries=max_entries, clock=clock)
+
+    async def _key(self, user_id, token: str) -> str:
+        generation = await self.backend.get_counter(str(user_id))
+        return f"{user_id}:{generation}:{token}"
+
+    async def get(self, user_id: str, token: str):
+        user = await self.backend.get(await self._key(user_id, token))
+        return None if user is None else _detached_copy(user)
+
+    async def set(self, user_id: str, token: str, user) -> None:
+        await self.backend.set(await self._key(user_id, token), _detached_copy(user), self.ttl)
+
+    async def invalidate(self, user_id) -> None:
+        await self.backend.incr(str(user_id))
+
+
+user_cache = UserCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+class CachingJWTStrategy(JWTStrategy):
+    """
+    JWT strategy that serves already-resolved active users from `user_cache`,
+    so authenticated requests skip the user lookup (and its extra DB session).
+    The token signature and expiry are still verified on every request (once).
+    """
+    async def read_token(self, token, user_manager):
+        if token is None:
+            return None
+
+        try:
+            data = decode_jwt(
+                token, self.decode_key, self.token_audience, algorithms=[self.algorithm]
+            )
+        except jwt.PyJWTError:
+            return None
+        user_id = data.get("sub")
+        if user_id is None:
+            return None
+
+        user = await user_cache.get(user_id, token)
+        if user is not None:
+            return user
+
+        try:
+            user = await user_manager.get(user_manager.parse_id(user_id))
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+        if user.is_active:
+            await user_cache.set(user_id, token, user)
+        return user
+
+
 def get_jwt_strategy():
-    return JWTStrategy(secret=settings.SECRET, lifetime_seconds=3600 * 24)
+    return CachingJWTStrategy(secret=settings.SECRET, lifetime_seconds=3600 * 24)
 
 bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
 
@@ -10,4 +100,4 @@ auth_backend = AuthenticationBackend(
     name="jwt",
     transport=bearer_transport,
     get_strategy=get_jwt_strategy,
-)
\ No newline at end of file
+)
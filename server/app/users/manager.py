@@ -1,8 +1,10 @@
-from fastapi import Depends
+from fastapi import Depends, Request
+from typing import Any, Optional
 from fastapi_users import BaseUserManager, UUIDIDMixin
 from uuid import UUID
 from app.config import settings
 from app.users.models import User
+from app.users.auth import user_cache
 from fastapi_users.db import SQLAlchemyUserDatabase
 from app.db import async_session_maker
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -15,5 +17,18 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
     reset_password_token_secret = settings.SECRET
     verification_token_secret = settings.SECRET
 
+    # drop cached auth lookups whenever a user changes
+    async def on_after_update(self, user: User, update_dict: dict[str, Any], request: Optional[Request] = None):
+        await user_cache.invalidate(user.id)
+
+    async def on_after_verify(self, user: User, request: Optional[Request] = None):
+        await user_cache.invalidate(user.id)
+
+    async def on_after_reset_password(self, user: User, request: Optional[Request] = None):
+        await user_cache.invalidate(user.id)
+
+    async def on_after_delete(self, user: User, request: Optional[Request] = None):
+        await user_cache.invalidate(user.id)
+
 async def get_user_manager(user_db=Depends(get_user_db)):
     yield UserManager(user_db)
\ No newline at end of file
@@ -0,0 +1,105 @@
+# app/watermarks.py
+"""
+Per-user change watermarks and conditional GETs.
+
+Write endpoints call `touch(session, user_id, resource)` inside their
+transaction, which bumps a (user, resource) version and timestamp. Read
+endpoints depend on `conditional_get(...)`: it turns the watermark into an
+ETag and answers a matching If-None-Match with 304 before the handler (and its
+queries) runs. Reading a watermark is a single primary-key lookup.
+"""
+import hashlib
+from datetime import date
+from typing import Optional, Tuple, Union
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import BigInteger, DateTime, ForeignKey, String, func, select
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class ChangeWatermark(Base):
+    __tablename__ = "change_watermarks"
+
+    user_id: Mapped[str] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    resource: Mapped[str] = mapped_column(String(30), primary_key=True)  # "transactions" | "budgets"
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=1)
+    changed_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+async def touch(session: AsyncSession, user_id, *resources: str) -> None:
+    """
+    Record that the user's `resources` changed; commits with the caller's transaction.
+    The new changed_at also keeps the user's reads on the primary for a while
+    (read-your-writes, see app/replica.py).
+    """
+    stmt = pg_insert(ChangeWatermark).values(
+        [{"user_id": user_id, "resource": resource, "version": 1} for resource in resources]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ChangeWatermark.user_id, ChangeWatermark.resource],
+        set_={"version": ChangeWatermark.version + 1, "changed_at": func.now()},
+    )
+    await session.execute(stmt)
+
+
+def make_etag(user_id, state: str, request: Request, extra: str = "") -> str:
+    # the date is part of the tag because dashboard windows move with "today"
+    raw = f"{user_id}|{state}|{date.today()}|{extra}|{request.url.path}?{request.url.query}"
+    return 'W/"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison: W/ prefixes are ignored
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def conditional_get(resource: Union[str, Tuple[str, ...]], get_session, current_user_dependency, vary=None):
+    """
+    Build a dependency for GET endpoints whose output only changes with `resource`
+    (one name or a tuple of them; and with `await vary(session)`, if given, a
+    string for state that isn't per user).
+    Returns the ETag / Cache-Control headers (also set on the response), or
+    raises 304 Not Modified.
+    """
+    resources = (resource,) if isinstance(resource, str) else tuple(resource)
+
+    async def dependency(
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(get_session),
+        current_user = Depends(current_user_dependency),
+    ) -> dict:
+        result = await session.execute(
+            select(ChangeWatermark.resource, ChangeWatermark.version, ChangeWatermark.changed_at).where(
+                ChangeWatermark.user_id == current_user.id,
+                ChangeWatermark.resource.in_(resources),
+            )
+        )
+        found = {name: (version, changed_at) for name, version, changed_at in result.all()}
+        state = "|".join(
+            f"{name}:{version}:{changed_at}"
+            for name, (version, changed_at) in ((name, found.get(name, (0, None))) for name in resources)
+        )
+        extra = await vary(session) if vary else ""
+        etag = make_etag(current_user.id, state, request, extra)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if _matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return headers
+
+    return dependency
@@ -0,0 +1,338 @@
+# bench/load.py
+"""
+HTTP load generator for the API.
+
+Logs in as the users created by bench.seed and drives a weighted mix of every
+transactions / budgets / dashboard / auth endpoint at a fixed concurrency for a
+fixed duration, then writes throughput and p50/p95/p99 latency per endpoint to a
+JSON file.
+
+    python -m bench.load --base-url http://localhost:8000 --concurrency 32 --duration 60 \
+        --out results/after.json
+    python -m bench.load compare results/before.json results/after.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+
+import httpx
+
+from bench.seed import EMAIL_PATTERN, EXPENSE_CATEGORIES, NOTE_WORDS, PASSWORD
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name: str, seconds: float, status: int):
+        self.latencies[name].append(seconds)
+        self.statuses[name][status] += 1
+        if status >= 400:
+            self.errors[name] += 1
+
+    def fail(self, name: str, seconds: float):
+        self.record(name, seconds, 599)
+
+
+def percentile(sorted_values, p: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    endpoints = {}
+    total = 0
+    for name, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        total += len(values)
+        endpoints[name] = {
+            "count": len(values),
+            "errors": recorder.errors[name],
+            "statuses": dict(recorder.statuses[name]),
+            "rps": round(len(values) / elapsed, 2),
+            "mean_ms": round(sum(values) / len(values) * 1000, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+        }
+    return {"elapsed_s": round(elapsed, 2), "requests": total, "rps": round(total / elapsed, 2), "endpoints": endpoints}
+
+
+class VirtualUser:
+    """
+    One logged-in client issuing a weighted mix of requests.
+    """
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, email: str, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.email = email
+        self.rng = rng
+        self.headers = {}
+        self.tx_ids = []
+        self.cursor = ""
+
+    async def call(self, name: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+            await response.aread()
+        except httpx.HTTPError:
+            self.recorder.fail(name, time.perf_counter() - started)
+            return None
+        self.recorder.record(name, time.perf_counter() - started, response.status_code)
+        return response
+
+    # ---- auth ----
+    async def login(self):
+        response = await self.call(
+            "POST /auth/jwt/login", "POST", "/auth/jwt/login",
+            data={"username": self.email, "password": PASSWORD},
+        )
+        if response is not None and response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return bool(self.headers)
+
+    async def register(self):
+        email = EMAIL_PATTERN.format(f"reg-{uuid.uuid4().hex[:12]}")
+        await self.call("POST /auth/register", "POST", "/auth/register", json={"email": email, "password": PASSWORD})
+
+    async def me(self):
+        await self.call("GET /users/me", "GET", "/users/me")
+
+    # ---- transactions ----
+    def _tx_payload(self):
+        category = self.rng.choice(list(EXPENSE_CATEGORIES))
+        return {
+            "type": "EXPENSE",
+            "category": category,
+            "amount": round(self.rng.uniform(1, 200), 2),
+            "date": (date.today() - timedelta(days=self.rng.randrange(365))).isoformat(),
+            "note": " ".join(self.rng.sample(NOTE_WORDS, 2)),
+        }
+
+    async def list_transactions(self):
+        response = await self.call("GET /transactions/", "GET", "/transactions/", params={"limit": 50})
+        if response is not None and response.status_code == 200:
+            self.tx_ids = [tx["id"] for tx in response.json()][:20]
+
+    async def list_transactions_deep(self):
+        await self.call(
+            "GET /transactions/ (deep skip)", "GET", "/transactions/",
+            params={"limit": 50, "skip": self.rng.randrange(0, 10_000, 50)},
+        )
+
+    async def list_transactions_cursor(self):
+        response = await self.call(
+            "GET /transactions/ (cursor)", "GET", "/transactions/",
+            params={"limit": 50, "cursor": self.cursor},
+        )
+        if response is not None and response.status_code == 200:
+            self.cursor = response.json().get("next_cursor") or ""
+
+    async def list_transactions_filtered(self):
+        await self.call(
+            "GET /transactions/ (filtered)", "GET", "/transactions/",
+            params={
+                "type": "EXPENSE",
+                "category": self.rng.choice(list(EXPENSE_CATEGORIES)),
+                "date_from": (date.today() - timedelta(days=365)).isoformat(),
+                "limit": 100,
+            },
+        )
+
+    async def search(self):
+        word = self.rng.choice(NOTE_WORDS)
+        await self.call("GET /transactions/search", "GET", "/transactions/search", params={"q": word[:3]})
+
+    async def get_transaction(self):
+        if self.tx_ids:
+            tx_id = self.rng.choice(self.tx_ids)
+            await self.call("GET /transactions/{id}", "GET", f"/transactions/{tx_id}")
+
+    async def create_update_delete_transaction(self):
+        response = await self.call("POST /transactions/", "POST", "/transactions/", json=self._tx_payload())
+        if response is None or response.status_code != 201:
+            return
+        tx_id = response.json()["id"]
+        await self.call(
+            "PUT /transactions/{id}", "PUT", f"/transactions/{tx_id}",
+            json={"category": self.rng.choice(list(EXPENSE_CATEGORIES)), "amount": 42.0},
+        )
+        await self.call("DELETE /transactions/{id}", "DELETE", f"/transactions/{tx_id}")
+
+    async def import_transactions(self):
+        body = "".join(json.dumps(self._tx_payload()) + "\n" for _ in range(200))
+        await self.call(
+            "POST /transactions/import", "POST", "/transactions/import",
+            params={"format": "ndjson"}, content=body.encode(),
+        )
+
+    async def export(self):
+        await self.call(
+            "GET /transactions/export", "GET", "/transactions/export",
+            params={"format": "csv", "date_from": (date.today() - timedelta(days=90)).isoformat()},
+        )
+
+    # ---- budgets ----
+    async def list_budgets(self):
+        await self.call("GET /budgets/", "GET", "/budgets/")
+
+    async def spent(self):
+        await self.call("GET /budgets/spent", "GET", "/budgets/spent")
+
+    async def budget_status(self):
+        await self.call("GET /budgets/status", "GET", "/budgets/status")
+
+    async def create_update_delete_budget(self):
+        response = await self.call(
+            "POST /budgets/", "POST", "/budgets/",
+            json={"category": self.rng.choice(list(EXPENSE_CATEGORIES)), "amount": 300, "period": "MONTHLY"},
+        )
+        if response is None or response.status_code != 201:
+            return
+        budget_id = response.json()["id"]
+        await self.call("PUT /budgets/{id}", "PUT", f"/budgets/{budget_id}", json={"amount": 350})
+        await self.call("DELETE /budgets/{id}", "DELETE", f"/budgets/{budget_id}")
+
+    # ---- dashboard ----
+    async def dashboard_summary(self):
+        await self.call("GET /dashboard/summary", "GET", "/dashboard/summary")
+
+    async def dashboard_recent(self):
+        await self.call("GET /dashboard/recent", "GET", "/dashboard/recent")
+
+    async def dashboard_category_expense(self):
+        await self.call("GET /dashboard/category-expense", "GET", "/dashboard/category-expense")
+
+    async def dashboard_monthly_trend(self):
+        await self.call("GET /dashboard/monthly-trend", "GET", "/dashboard/monthly-trend", params={"months": 12})
+
+    async def dashboard_overview(self):
+        await self.call("GET /dashboard/overview", "GET", "/dashboard/overview")
+
+    def scenario(self):
+        """
+        (weight, action) pairs; roughly a read-heavy interactive session.
+        """
+        return [
+            (12, self.list_transactions),
+            (4, self.list_transactions_deep),
+            (6, self.list_transactions_cursor),
+            (5, self.list_transactions_filtered),
+            (4, self.search),
+            (6, self.get_transaction),
+            (4, self.create_update_delete_transaction),
+            (1, self.import_transactions),
+            (1, self.export),
+            (5, self.list_budgets),
+            (5, self.spent),
+            (4, self.budget_status),
+            (2, self.create_update_delete_budget),
+            (6, self.dashboard_summary),
+            (4, self.dashboard_recent),
+            (4, self.dashboard_category_expense),
+            (4, self.dashboard_monthly_trend),
+            (6, self.dashboard_overview),
+            (3, self.me),
+            (1, self.login),
+            (1, self.register),
+        ]
+
+    async def run(self, deadline: float):
+        if not await self.login():
+            return
+        weights, actions = zip(*self.scenario())
+        while time.perf_counter() < deadline:
+            await self.rng.choices(actions, weights)[0]()
+
+
+async def run_load(args) -> dict:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        users = [
+            VirtualUser(client, recorder, EMAIL_PATTERN.format(i % args.users), random.Random(args.seed + i))
+            for i in range(args.concurrency)
+        ]
+        started = time.perf_counter()
+        await asyncio.gather(*(u.run(started + args.duration) for u in users))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "config": {
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "users": args.users,
+            "seed": args.seed,
+        },
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        **summarize(recorder, elapsed),
+    }
+
+
+def compare(before_path: str, after_path: str) -> None:
+    """
+    Print per-endpoint p50/p95/p99 and throughput deltas between two result files.
+    """
+    with open(before_path) as f:
+        before = json.load(f)["endpoints"]
+    with open(after_path) as f:
+        after = json.load(f)["endpoints"]
+
+    print(f"{'endpoint':40} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16} {'rps':>14}")
+    for name in sorted(set(before) | set(after)):
+        a, b = before.get(name), after.get(name)
+        if a is None or b is None:
+            print(f"{name:40} {'only in ' + ('after' if a is None else 'before'):>16}")
+            continue
+        cells = [f"{a[k]:.1f}->{b[k]:.1f}" for k in ("p50_ms", "p95_ms", "p99_ms", "rps")]
+        print(f"{name:40} {cells[0]:>16} {cells[1]:>16} {cells[2]:>16} {cells[3]:>14}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "compare":
+        parser = argparse.ArgumentParser(prog="bench.load compare")
+        parser.add_argument("before")
+        parser.add_argument("after")
+        args = parser.parse_args(sys.argv[2:])
+        compare(args.before, args.after)
+        return
+
+    parser = argparse.ArgumentParser(description="Drive the API with a realistic request mix")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=20, help="bench users created by bench.seed")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="bench-results.json")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load(args))
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for name, stats in results["endpoints"].items():
+        print(f"{name:40} n={stats['count']:>6} err={stats['errors']:>4} "
+              f"p50={stats['p50_ms']:>8.1f} p95={stats['p95_ms']:>8.1f} p99={stats['p99_ms']:>8.1f} ms")
+    print(f"total {results['requests']} requests, {results['rps']} req/s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# bench/seed.py
+"""
+Synthetic data generator for benchmarks.
+
+Creates bench users (bench-user-<n>@example.com / password "benchpass"), years of
+realistic transactions per user and a handful of budgets, loading everything
+with COPY. Existing bench users are deleted first (their rows cascade). The schema must
+already exist: run `python -m app.migrate` first.
+
+    python -m bench.seed --users 50 --transactions-per-user 40000 --years 5
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+import asyncpg
+from fastapi_users.password import PasswordHelper
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config import settings
+from app.transactions import partitions
+from app.transactions.rollups import rebuild
+
+PASSWORD = "benchpass"
+EMAIL_PATTERN = "bench-user-{}@example.com"
+
+# category -> (relative frequency, median amount)
+EXPENSE_CATEGORIES = {
+    "Food": (30, 18),
+    "Groceries": (20, 55),
+    "Transport": (15, 12),
+    "Entertainment": (8, 35),
+    "Shopping": (8, 60),
+    "Utilities": (4, 90),
+    "Health": (3, 45),
+    "Travel": (2, 400),
+    "Education": (2, 120),
+    "Gifts": (2, 50),
+}
+INCOME_CATEGORIES = {"Freelance": (4, 350), "Interest": (2, 15), "Refund": (2, 40)}
+NOTE_WORDS = (
+    "coffee lunch dinner market supermarket uber taxi bus train cinema concert "
+    "amazon pharmacy doctor gym books course hotel flight birthday electricity "
+    "water internet phone bonus project invoice cashback"
+).split()
+
+BUDGET_PERIODS = ("MONTHLY", "MONTHLY", "MONTHLY", "WEEKLY", "YEARLY")
+
+TX_COLUMNS = ("user_id", "type", "category_id", "amount", "date", "note")
+CATEGORY_NAMES = ["Salary", "Rent", *EXPENSE_CATEGORIES, *INCOME_CATEGORIES]
+COPY_CHUNK = 50_000
+
+
+def asyncpg_dsn(url: str) -> str:
+    return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+def _amount(rng: random.Random, median: float) -> Decimal:
+    return Decimal(f"{rng.lognormvariate(0, 0.6) * median:.2f}")
+
+
+def _note(rng: random.Random):
+    if rng.random() < 0.3:
+        return None
+    return " ".join(rng.sample(NOTE_WORDS, rng.randint(1, 3)))
+
+
+def generate_transactions(rng: random.Random, user_id, count: int, start: date, end: date):
+    """
+    Yield `count` transaction records between start and end: fixed monthly
+    salary and rent, plus weighted random expenses/incomes.
+    """
+    days = (end - start).days
+    produced = 0
+
+    month = start.replace(day=1)
+    while month <= end and produced < count:
+        yield (user_id, "INCOME", "Salary", _amount(rng, 3000), month + timedelta(days=27), "monthly salary")
+        yield (user_id, "EXPENSE", "Rent", Decimal("1200.00"), month, "rent")
+        produced += 2
+        month = (month + timedelta(days=32)).replace(day=1)
+
+    expense_names = list(EXPENSE_CATEGORIES)
+    expense_weights = [w for w, _ in EXPENSE_CATEGORIES.values()]
+    income_names = list(INCOME_CATEGORIES)
+    income_weights = [w for w, _ in INCOME_CATEGORIES.values()]
+
+    while produced < count:
+        tx_date = start + timedelta(days=rng.randrange(days + 1))
+        if rng.random() < 0.06:
+            category = rng.choices(income_names, income_weights)[0]
+            yield (user_id, "INCOME", category, _amount(rng, INCOME_CATEGORIES[category][1]), tx_date, _note(rng))
+        else:
+            category = rng.choices(expense_names, expense_weights)[0]
+            yield (user_id, "EXPENSE", category, _amount(rng, EXPENSE_CATEGORIES[category][1]), tx_date, _note(rng))
+        produced += 1
+
+
+async def _copy_chunks(conn, records):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= COPY_CHUNK:
+            await conn.copy_records_to_table("transactions", records=chunk, columns=TX_COLUMNS)
+            chunk = []
+    if chunk:
+        await conn.copy_records_to_table("transactions", records=chunk, columns=TX_COLUMNS)
+
+
+async def seed(args) -> None:
+    rng = random.Random(args.seed)
+    end = date.today()
+    start = end - timedelta(days=365 * args.years)
+    hashed = PasswordHelper().hash(PASSWORD)
+
+    engine = create_async_engine(args.database_url)
+    # partitions first, so COPY doesn't pile years of rows into the default one
+    async with engine.begin() as sa_conn:
+        if await partitions.is_partitioned(sa_conn):
+            await partitions.ensure_range(sa_conn, start, end)
+
+    conn = await asyncpg.connect(asyncpg_dsn(args.database_url))
+    try:
+        await conn.execute("DELETE FROM \"user\" WHERE email LIKE 'bench-user-%@example.com'")
+
+        users = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(args.users)]
+        await conn.copy_records_to_table(
+            "user",
+            records=[
+                (uid, EMAIL_PATTERN.format(i), hashed, True, False, True, f"Bench User {i}")
+                for i, uid in enumerate(users)
+            ],
+            columns=("id", "email", "hashed_password", "is_active", "is_superuser", "is_verified", "full_name"),
+        )
+
+        started = time.perf_counter()
+        for i, uid in enumerate(users):
+            async with conn.transaction():
+                created = await conn.fetch(
+                    "INSERT INTO categories (user_id, name) SELECT $1, unnest($2::text[]) RETURNING name, id",
+                    uid, list(dict.fromkeys(CATEGORY_NAMES)),
+                )
+                ids = {row["name"]: row["id"] for row in created}
+                records = generate_transactions(rng, uid, args.transactions_per_user, start, end)
+                await _copy_chunks(conn, ((u, t, ids[c], *rest) for u, t, c, *rest in records))
+                budgets = [
+                    (uid, ids[category], Decimal(str(EXPENSE_CATEGORIES[category][1] * 25)), rng.choice(BUDGET_PERIODS))
+                    for category in rng.sample(list(EXPENSE_CATEGORIES), min(args.budgets_per_user, len(EXPENSE_CATEGORIES)))
+                ]
+                await conn.copy_records_to_table(
+                    "budgets", records=budgets, columns=("user_id", "category_id", "amount", "period")
+                )
+            print(f"user {i + 1}/{len(users)} seeded ({time.perf_counter() - started:.0f}s)")
+
+        await conn.execute("ANALYZE transactions")
+    finally:
+        await conn.close()
+
+    print("rebuilding monthly rollups ...")
+    async with AsyncSession(engine) as session:
+        for uid in users:
+            await rebuild(session, uid)
+        await session.commit()
+    await engine.dispose()
+
+    print(f"done: {args.users} users x {args.transactions_per_user} transactions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic benchmark data")
+    parser.add_argument("--database-url", default=settings.POSTGRES_URL)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--transactions-per-user", type=int, default=20_000)
+    parser.add_argument("--budgets-per-user", type=int, default=5)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(seed(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
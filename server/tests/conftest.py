@@ -0,0 +1,15 @@
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Stands in for time.monotonic; tests move it with `clock.now += seconds`."""
+    return FakeClock()
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.admission import AdmissionController, Limits, TokenBucket
+
+
+def controller(clock, rate=0.0, burst=0, concurrency=0, **kwargs) -> AdmissionController:
+    return AdmissionController({"cheap": Limits(rate, burst, concurrency)}, clock=clock, **kwargs)
+
+
+def test_token_bucket_refills_at_rate(clock):
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert not bucket.full()
+
+    clock.now += 0.5
+    assert bucket.reserve() == pytest.approx(0.5)  # the refilled token went to the earlier waiter
+    clock.now += 10
+    assert bucket.full()
+
+
+def test_token_bucket_cancel_returns_the_token(clock):
+    bucket = TokenBucket(rate=1, burst=1, clock=clock)
+    bucket.reserve()
+    assert bucket.reserve() == pytest.approx(1.0)
+    bucket.cancel()
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_over_rate_is_rejected_with_retry_after(clock):
+    admission = controller(clock, rate=1, burst=1, queue_timeout=0.5)
+
+    async def run():
+        async with admission.admit("u1", "cheap"):
+            pass
+        with pytest.raises(HTTPException) as exc:
+            async with admission.admit("u1", "cheap"):
+                pass
+        return exc.value
+
+    error = asyncio.run(run())
+    assert error.status_code == 429
+    assert error.headers["Retry-After"] == "1"
+    # the rejected request's token was given back
+    assert admission._lanes[("u1", "cheap")].bucket.tokens == pytest.approx(0)
+
+
+def test_users_have_separate_buckets(clock):
+    admission = controller(clock, rate=1, burst=1, queue_timeout=0.5)
+
+    async def run():
+        for user_id in ("u1", "u2"):
+            async with admission.admit(user_id, "cheap"):
+                pass
+
+    asyncio.run(run())
+
+
+def test_full_queue_is_rejected(clock):
+    admission = controller(clock, concurrency=1, queue_size=0)
+
+    async def run():
+        async with admission.admit("u1", "cheap"):
+            with pytest.raises(HTTPException) as exc:
+                async with admission.admit("u1", "cheap"):
+                    pass
+        return exc.value
+
+    assert asyncio.run(run()).status_code == 429
+
+
+def test_slot_wait_times_out_and_returns_the_token(clock):
+    admission = controller(clock, rate=100, burst=5, concurrency=1, queue_timeout=0.01)
+
+    async def run():
+        async with admission.admit("u1", "cheap"):
+            with pytest.raises(HTTPException) as exc:
+                async with admission.admit("u1", "cheap"):
+                    pass
+        return exc.value
+
+    assert asyncio.run(run()).status_code == 429
+    lane = admission._lanes[("u1", "cheap")]
+    assert lane.bucket.tokens == pytest.approx(4)  # only the admitted request's token is spent
+    assert lane.waiting == 0 and lane.in_flight == 0
+
+
+def test_waiting_request_gets_the_released_slot(clock):
+    admission = controller(clock, concurrency=1, queue_timeout=5)
+    order = []
+
+    async def request(name, hold):
+        async with admission.admit("u1", "cheap"):
+            order.append(name)
+            await hold
+
+    async def run():
+        release = asyncio.Event()
+        first = asyncio.create_task(request("first", release.wait()))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(request("second", asyncio.sleep(0)))
+        await asyncio.sleep(0)
+        assert admission._lanes[("u1", "cheap")].waiting == 1
+        release.set()
+        await asyncio.gather(first, second)
+
+    asyncio.run(run())
+    assert order == ["first", "second"]
+    assert admission._lanes[("u1", "cheap")].in_flight == 0
+
+
+def test_idle_lanes_are_forgotten_past_max_users(clock):
+    admission = controller(clock, rate=1, burst=1, max_users=2)
+
+    async def run():
+        for user_id in ("u1", "u2"):
+            async with admission.admit(user_id, "cheap"):
+                pass
+        clock.now += 5  # both buckets refill
+        async with admission.admit("u3", "cheap"):
+            pass
+
+    asyncio.run(run())
+    assert set(admission._lanes) == {("u3", "cheap")}
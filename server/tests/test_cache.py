@@ -0,0 +1,140 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.cache import KeyValueBackend, LocalKeyValueClient, MemoryBackend, ResponseCache
+
+
+@pytest.fixture(params=["memory", "local-kv"])
+def cache(request, clock):
+    if request.param == "memory":
+        backend = MemoryBackend(clock=clock)
+    else:
+        backend = KeyValueBackend(LocalKeyValueClient(clock=clock))
+    return ResponseCache(backend, ttl=60)
+
+
+def make_handler(cache: ResponseCache, namespace: str = "dashboard"):
+    calls = []
+
+    @cache.cached(namespace)
+    async def handler(months: int = 6, session=None, current_user=None):
+        calls.append(months)
+        return {"months": months, "call": len(calls)}
+
+    return handler, calls
+
+
+def user(user_id):
+    return SimpleNamespace(id=user_id)
+
+
+def test_hit_after_miss(cache):
+    handler, calls = make_handler(cache)
+
+    async def run():
+        first = await handler(months=6, session=object(), current_user=user(1))
+        second = await handler(months=6, session=object(), current_user=user(1))
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == {"months": 6, "call": 1}
+    assert calls == [6]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_includes_params_and_user(cache):
+    handler, calls = make_handler(cache)
+
+    async def run():
+        await handler(months=6, current_user=user(1))
+        await handler(months=12, current_user=user(1))
+        await handler(months=6, current_user=user(2))
+
+    asyncio.run(run())
+    assert calls == [6, 12, 6]
+
+
+def test_invalidate_user_drops_only_that_user_and_namespace(cache):
+    dashboard, dashboard_calls = make_handler(cache, "dashboard")
+    budgets, budgets_calls = make_handler(cache, "budgets")
+
+    async def run():
+        for handler in (dashboard, budgets):
+            await handler(current_user=user(1))
+            await handler(current_user=user(2))
+        await cache.invalidate_user(1, "dashboard")
+        for handler in (dashboard, budgets):
+            await handler(current_user=user(1))
+            await handler(current_user=user(2))
+
+    asyncio.run(run())
+    assert len(dashboard_calls) == 3  # user 1 recomputed once
+    assert len(budgets_calls) == 2
+    assert cache.invalidations == 1
+
+
+def test_etag_is_part_of_the_key(cache):
+    calls = []
+
+    @cache.cached("dashboard")
+    async def handler(session=None, current_user=None, cache_headers=None):
+        calls.append(cache_headers["ETag"])
+        return {"etag": cache_headers["ETag"]}
+
+    async def run():
+        old = await handler(current_user=user(1), cache_headers={"ETag": 'W/"v1"'})
+        # a write committed, invalidate_user not run yet
+        new = await handler(current_user=user(1), cache_headers={"ETag": 'W/"v2"'})
+        return old, new
+
+    old, new = asyncio.run(run())
+    assert (old["etag"], new["etag"]) == ('W/"v1"', 'W/"v2"')
+    assert len(calls) == 2
+
+
+def test_entries_expire_after_ttl(clock, cache):
+    handler, calls = make_handler(cache)
+
+    async def run():
+        await handler(current_user=user(1))
+        clock.now += 59
+        await handler(current_user=user(1))
+        clock.now += 2
+        await handler(current_user=user(1))
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_entries=2)
+
+    async def run():
+        await backend.set("a", 1, 60)
+        await backend.set("b", 2, 60)
+        await backend.get("a")
+        await backend.set("c", 3, 60)
+        await backend.incr("gen:x")
+        return [await backend.get(k) for k in "abc"], await backend.get_counter("gen:x")
+
+    values, counter = asyncio.run(run())
+    assert values == [1, None, 3]
+    assert counter == 1
+    assert len(backend) == 2
+
+
+def test_local_key_value_client_is_bounded(clock):
+    client = LocalKeyValueClient(max_entries=2, clock=clock)
+
+    async def run():
+        await client.set("a", "1", ex=60)
+        await client.set("b", "2", ex=10)
+        await client.set("c", "3", ex=60)  # evicts "a"
+        await client.incr("gen:x")
+        clock.now += 30  # "b" expired
+        return [await client.get(k) for k in ("a", "b", "c", "gen:x")]
+
+    assert asyncio.run(run()) == [None, None, "3", "1"]
+    assert len(client) == 1
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.transactions import importer
+
+
+def parse(text: str, chunk_size: int = 7) -> list:
+    async def stream():
+        data = text.encode()
+        for i in range(0, len(data), chunk_size):
+            yield data[i:i + chunk_size]
+
+    async def collect():
+        return [row async for row in importer.iter_csv_rows(stream())]
+
+    return asyncio.run(collect())
+
+
+def test_rows_are_keyed_by_lowercased_header():
+    rows = parse("Date, Amount ,note\n2024-01-05,12.50,lunch\n2024-01-06,3,\n")
+    assert rows == [
+        (2, {"date": "2024-01-05", "amount": "12.50", "note": "lunch"}, None),
+        (3, {"date": "2024-01-06", "amount": "3", "note": None}, None),
+    ]
+
+
+def test_bom_crlf_and_blank_lines():
+    rows = parse("\ufeffdate,amount\r\n\r\n2024-01-05,1\r\n   \r\n2024-01-06,2\r\n")
+    assert [(line, row) for line, row, _ in rows] == [
+        (3, {"date": "2024-01-05", "amount": "1"}),
+        (5, {"date": "2024-01-06", "amount": "2"}),
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+def test_quoted_field_spanning_lines(chunk_size):
+    rows = parse('date,note\n2024-01-05,"first\nsecond, ""third"""\n2024-01-06,x\n', chunk_size)
+    assert rows == [
+        (2, {"date": "2024-01-05", "note": 'first\nsecond, "third"'}, None),
+        (4, {"date": "2024-01-06", "note": "x"}, None),
+    ]
+
+
+def test_quote_inside_unquoted_field_is_literal():
+    rows = parse('date,note\n2024-01-05,TV 55" screen\n2024-01-06,x\n')
+    assert [row["note"] for _, row, _ in rows] == ['TV 55" screen', "x"]
+
+
+def test_column_count_mismatch_is_reported_per_row():
+    rows = parse("date,amount\n2024-01-05\n2024-01-06,1\n")
+    assert rows == [
+        (2, None, "expected 2 columns, got 1"),
+        (3, {"date": "2024-01-06", "amount": "1"}, None),
+    ]
+
+
+def test_unterminated_quoted_field():
+    rows = parse('date,note\n2024-01-05,ok\n2024-01-06,"open\n2024-01-07,x\n')
+    assert rows == [
+        (2, {"date": "2024-01-05", "note": "ok"}, None),
+        (3, None, "unterminated quoted field"),
+    ]
+
+
+def test_overlong_record_is_skipped(monkeypatch):
+    monkeypatch.setattr(importer, "MAX_RECORD_LENGTH", 50)
+    text = 'date,note\n2024-01-05,"' + "x\n" * 100 + '"\n2024-01-06,ok\n'
+    rows = parse(text)
+    assert rows == [
+        (2, None, "record longer than 50 characters"),
+        (103, {"date": "2024-01-06", "note": "ok"}, None),
+    ]
+
+
+def test_ndjson_rows():
+    async def stream():
+        yield b'{"amount": 1}\n\n[1]\n{bad\n'
+
+    async def collect():
+        return [row async for row in importer.iter_ndjson_rows(stream())]
+
+    rows = asyncio.run(collect())
+    assert rows[0] == (1, {"amount": 1}, None)
+    assert rows[1] == (3, None, "expected a JSON object")
+    assert rows[2][0] == 4 and rows[2][2].startswith("invalid JSON")
@@ -0,0 +1,29 @@
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.metrics import DB_POOL_CHECKED_IN, DB_POOL_CHECKED_OUT, DB_POOL_OVERFLOW, instrument_engine
+
+
+def gauges(name: str) -> tuple:
+    return tuple(
+        gauge.labels(name)._value.get() for gauge in (DB_POOL_CHECKED_OUT, DB_POOL_CHECKED_IN, DB_POOL_OVERFLOW)
+    )
+
+
+def test_pool_gauges_follow_checkouts_and_checkins():
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=2, max_overflow=1)
+    instrument_engine(SimpleNamespace(sync_engine=engine), name="test")
+
+    connections = [engine.connect() for _ in range(3)]
+    assert gauges("test") == (3, 0, 1)
+
+    connections.pop().close()  # back to the pool
+    assert gauges("test") == (2, 1, 1)
+    connections.pop().close()
+    assert gauges("test") == (1, 2, 1)
+
+    connections.pop().close()  # the queue is full: the overflow connection is closed
+    assert gauges("test") == (0, 2, 0)
+    engine.dispose()
@@ -0,0 +1,50 @@
+import base64
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app.transactions.pagination import decode_cursor, decode_sync_token, encode_cursor, encode_sync_token
+
+
+@pytest.mark.parametrize("tx_date, tx_id", [(date(2024, 1, 5), 1), (date(1999, 12, 31), 2**62)])
+def test_cursor_round_trip(tx_date, tx_id):
+    cursor = encode_cursor(tx_date, tx_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (tx_date, tx_id)
+
+
+def test_empty_cursor_is_first_page():
+    assert decode_cursor("") is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor!",
+        base64.urlsafe_b64encode(b"2024-01-05").decode(),
+        base64.urlsafe_b64encode(b"2024-13-05|1").decode(),
+        base64.urlsafe_b64encode(b"2024-01-05|x").decode(),
+        base64.urlsafe_b64encode(b"\xff\xfe|1").decode(),
+    ],
+)
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("seq", [0, 1, 123456789])
+def test_sync_token_round_trip(seq):
+    assert decode_sync_token(encode_sync_token(seq)) == seq
+
+
+def test_empty_sync_token_is_the_beginning():
+    assert decode_sync_token("") == 0
+
+
+@pytest.mark.parametrize("token", ["???", encode_cursor(date(2024, 1, 5), 1)])
+def test_invalid_sync_token_is_400(token):
+    with pytest.raises(HTTPException) as exc:
+        decode_sync_token(token)
+    assert exc.value.status_code == 400
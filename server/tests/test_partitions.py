@@ -0,0 +1,95 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.transactions import partitions
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class FakeConnection:
+    def __init__(self, lock_free: bool):
+        self.lock_free = lock_free
+        self.statements = []
+
+    async def execute(self, stmt, params=None):
+        self.statements.append(str(stmt))
+        return FakeResult(self.lock_free)
+
+
+def test_partition_names_and_periods():
+    assert partitions.period_start(date(2025, 7, 14), "year") == date(2025, 1, 1)
+    assert partitions.period_start(date(2025, 7, 14), "month") == date(2025, 7, 1)
+    assert partitions.next_period(date(2025, 12, 1), "month") == date(2026, 1, 1)
+    assert partitions.partition_name(date(2025, 1, 1), "year") == "transactions_y2025"
+    assert partitions.partition_name(date(2025, 3, 1), "month") == "transactions_y2025m03"
+
+
+def test_maintenance_is_skipped_while_another_session_holds_the_lock(monkeypatch):
+    calls = []
+
+    async def maintain(conn):
+        calls.append(conn)
+        return ["transactions_y2026"]
+
+    monkeypatch.setattr(partitions, "maintain", maintain)
+
+    busy = FakeConnection(lock_free=False)
+    assert asyncio.run(partitions.maintain_unless_running(busy)) is None
+    assert calls == [] and "pg_try_advisory_xact_lock" in busy.statements[0]
+
+    free = FakeConnection(lock_free=True)
+    assert asyncio.run(partitions.maintain_unless_running(free)) == ["transactions_y2026"]
+    assert calls == [free]
+
+
+def test_periodic_maintenance_can_be_disabled():
+    async def run():
+        task = partitions.PartitionMaintenance(0)
+        task.start()
+        assert task._task is None
+        task = partitions.PartitionMaintenance(3600)
+        task.start()
+        assert task._task is not None
+        await task.stop()
+        assert task._task is None
+
+    asyncio.run(run())
+
+
+class ColumnsResult:
+    def __init__(self, names):
+        self.names = names
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.names
+
+
+class ColumnsConnection:
+    def __init__(self, names):
+        self.names = names
+
+    async def execute(self, stmt, params=None):
+        return ColumnsResult(self.names)
+
+
+def test_copy_columns_leave_out_what_the_old_table_lacks():
+    old = ["id", "user_id", "type", "category_id", "amount", "date", "note", "created_at", "updated_at"]
+    columns = asyncio.run(partitions.copy_columns(ColumnsConnection(old), "transactions"))
+    assert columns == "id, user_id, type, category_id, amount, date, note, created_at, updated_at"
+
+
+def test_copy_columns_require_converted_categories():
+    old = ["id", "user_id", "type", "category", "amount", "date", "note"]
+    with pytest.raises(RuntimeError, match="category_id"):
+        asyncio.run(partitions.copy_columns(ColumnsConnection(old), "transactions"))
@@ -0,0 +1,85 @@
+import asyncio
+
+from app.replica import ReadRouter
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+class FakeSession:
+    def __init__(self, name, recent_write=False):
+        self.name = name
+        self.recent_write = recent_write
+        self.closed = False
+        self.queries = 0
+
+    async def execute(self, stmt):
+        self.queries += 1
+        return FakeResult((1,) if self.recent_write else None)
+
+    async def connection(self):
+        return None
+
+    async def close(self):
+        self.closed = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class Makers:
+    def __init__(self, recent_write=False):
+        self.recent_write = recent_write
+        self.made = []
+
+    def primary(self):
+        self.made.append(FakeSession("primary", self.recent_write))
+        return self.made[-1]
+
+    def replica(self):
+        self.made.append(FakeSession("replica"))
+        return self.made[-1]
+
+
+def used_session(router, user_id="u1") -> FakeSession:
+    async def run():
+        async with router.session(user_id) as session:
+            return session
+
+    return asyncio.run(run())
+
+
+def test_without_replica_reads_use_the_primary_without_a_check():
+    makers = Makers()
+    session = used_session(ReadRouter(makers.primary))
+    assert session.name == "primary" and session.queries == 0
+
+
+def test_reads_go_to_the_replica_without_recent_writes():
+    makers = Makers(recent_write=False)
+    session = used_session(ReadRouter(makers.primary, makers.replica))
+    assert session.name == "replica"
+    check = makers.made[0]
+    assert check.name == "primary" and check.queries == 1 and check.closed
+
+
+def test_recent_write_keeps_reads_on_the_checked_primary_session():
+    makers = Makers(recent_write=True)
+    session = used_session(ReadRouter(makers.primary, makers.replica))
+    assert session is makers.made[0] and session.name == "primary"
+    assert len(makers.made) == 1
+
+
+def test_anonymous_reads_skip_the_check():
+    makers = Makers(recent_write=True)
+    session = used_session(ReadRouter(makers.primary, makers.replica), user_id=None)
+    assert session.name == "replica"
+    assert len(makers.made) == 1
@@ -0,0 +1,23 @@
+import uuid
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.transactions.rollups import months_to_date
+
+
+def sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_current_month_stops_at_today():
+    months = months_to_date(uuid.uuid4(), date(2026, 8, 1), date(2026, 10, 18))
+    query = sql(select(months.c.month, months.c.total, months.c.tx_count))
+
+    stored, future = query.split("UNION ALL")
+    assert "transaction_monthly_rollups.month >= '2026-08-01'" in stored
+    # rows dated later this month are subtracted again, with their count
+    assert "'2026-10-01'" in future and "-transactions.amount" in future and "-1" in future
+    assert "transactions.date > '2026-10-18'" in future
+    assert "transactions.date < '2026-11-01'" in future
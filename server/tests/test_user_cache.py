@@ -0,0 +1,55 @@
+import asyncio
+import uuid
+
+from app.users.auth import UserCache
+from app.users.models import User
+
+
+def make_user() -> User:
+    return User(id=uuid.uuid4(), email="a@example.com", hashed_password="x", is_active=True)
+
+
+def test_hit_is_a_fresh_copy_until_ttl(clock):
+    cache = UserCache(ttl=5, clock=clock)
+    user = make_user()
+
+    async def run():
+        await cache.set(str(user.id), "t1", user)
+        first = await cache.get(str(user.id), "t1")
+        other_token = await cache.get(str(user.id), "t2")
+        clock.now += 6
+        return first, other_token, await cache.get(str(user.id), "t1")
+
+    first, other_token, expired = asyncio.run(run())
+    assert first is not user and first.email == user.email
+    assert other_token is None
+    assert expired is None
+
+
+def test_invalidate_drops_only_that_user(clock):
+    cache = UserCache(clock=clock)
+    alice, bob = make_user(), make_user()
+
+    async def run():
+        await cache.set(str(alice.id), "ta", alice)
+        await cache.set(str(bob.id), "tb", bob)
+        await cache.invalidate(alice.id)
+        return await cache.get(str(alice.id), "ta"), await cache.get(str(bob.id), "tb")
+
+    alice_hit, bob_hit = asyncio.run(run())
+    assert alice_hit is None
+    assert bob_hit.id == bob.id
+
+
+def test_entries_are_bounded(clock):
+    cache = UserCache(max_entries=2, clock=clock)
+    users = [make_user() for _ in range(3)]
+
+    async def run():
+        for user in users:
+            await cache.set(str(user.id), "t", user)
+        return [await cache.get(str(user.id), "t") for user in users]
+
+    hits = asyncio.run(run())
+    assert hits[0] is None
+    assert len(cache.backend) == 2
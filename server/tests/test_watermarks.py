@@ -0,0 +1,75 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+
+from app.watermarks import conditional_get
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """
+    Answers the watermark query with the rows of `versions` ({resource: version}).
+    """
+    def __init__(self, versions):
+        self.versions = versions
+
+    async def execute(self, stmt):
+        return FakeResult([(name, version, None) for name, version in self.versions.items()])
+
+
+def make_request(if_none_match=None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/budgets/status", "query_string": b"", "headers": headers})
+
+
+def etag_for(dependency, versions, if_none_match=None) -> str:
+    headers = asyncio.run(
+        dependency(
+            request=make_request(if_none_match),
+            response=Response(),
+            session=FakeSession(versions),
+            current_user=SimpleNamespace(id=1),
+        )
+    )
+    return headers["ETag"]
+
+
+def test_etag_changes_with_any_of_the_resources():
+    dependency = conditional_get(("budgets", "transactions"), None, None)
+    base = etag_for(dependency, {"budgets": 1, "transactions": 1})
+    assert etag_for(dependency, {"budgets": 1, "transactions": 1}) == base
+    assert etag_for(dependency, {"budgets": 1, "transactions": 2}) != base
+    assert etag_for(dependency, {"budgets": 2, "transactions": 1}) != base
+    assert etag_for(dependency, {"transactions": 1}) != base
+
+
+def test_matching_if_none_match_is_304():
+    dependency = conditional_get("transactions", None, None)
+    etag = etag_for(dependency, {"transactions": 3})
+    with pytest.raises(HTTPException) as exc:
+        etag_for(dependency, {"transactions": 3}, if_none_match=etag.removeprefix("W/"))
+    assert exc.value.status_code == 304
+    assert exc.value.headers["ETag"] == etag
+
+
+def test_vary_is_part_of_the_etag():
+    versions = {"transactions": 1}
+    rates = {"version": "a"}
+
+    async def vary(session):
+        return rates["version"]
+
+    dependency = conditional_get("transactions", None, None, vary=vary)
+    before = etag_for(dependency, versions)
+    rates["version"] = "b"
+    assert etag_for(dependency, versions) != before